@@ -65,6 +65,15 @@ if 'data_loaded' in st.session_state and st.session_state.data_loaded:
         La aplicación está lista para ser usada.
         """
     )
+    st.caption(
+        f"Versión de datos: {st.session_state.data_version} "
+        f"(cargada el {st.session_state.data_loaded_at:%d/%m/%Y %H:%M}). "
+        "Los datos se comparten entre todos los usuarios conectados."
+    )
+    if st.button("🔄 Recargar datos desde 'data/'"):
+        with st.spinner("Recargando y limpiando los archivos..."):
+            data_loader.reload_data()
+        st.rerun()
 else:
     st.error(
         """
@@ -0,0 +1,375 @@
+# --- ARCHIVO: benchmarks/run_benchmarks.py ---
+# (Mide tiempo y memoria pico de cada etapa de los motores con datos sintéticos)
+#
+# Uso (desde la raíz del repo):
+#   python -m benchmarks.run_benchmarks --preset pequeno
+#   python -m benchmarks.run_benchmarks --skus 20000 --filas-consumo 2000000 --etapas radar_matriz simulacion_portafolio
+#   python -m benchmarks.run_benchmarks --preset pequeno --con-excel
+#   python -m benchmarks.run_benchmarks --comparar benchmarks/results/A.json benchmarks/results/B.json
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+for ruta in (str(RAIZ), str(RAIZ / 'src')):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+import config
+import data_pipeline
+import radar_engine
+import row_index
+import simulator
+from demand_cube import build_demand_cube
+from data_store import TABLE_NAMES
+from benchmarks.synthetic_data import make_dataset, write_excel_files
+
+RESULTS_DIR = RAIZ / 'benchmarks' / 'results'
+
+PRESETS = {
+    'pequeno': dict(n_skus=1_000, n_bodegas_stock=3, n_bodegas_consumo=5, n_filas_consumo=100_000, meses_historia=4),
+    'mediano': dict(n_skus=20_000, n_bodegas_stock=5, n_bodegas_consumo=10, n_filas_consumo=2_000_000, meses_historia=6),
+    'grande': dict(n_skus=100_000, n_bodegas_stock=8, n_bodegas_consumo=20, n_filas_consumo=10_000_000, meses_historia=12),
+}
+
+# Parámetros de negocio fijos (los mismos valores por defecto de las páginas)
+LEAD_TIME = 90
+Z = config.Z_SCORE_MAP['99%']
+DIAS_SIMULACION = 100
+SKUS_SIMULACION_INDIVIDUAL = 50
+TRAYECTORIAS_MONTE_CARLO = 10_000
+
+
+# --- 1. Etapas ---
+# Cada etapa recibe el contexto (dataset y derivados) y retorna una función
+# sin argumentos que ejecuta solo lo que se quiere medir.
+
+def _etapa_preparacion_oc(ctx):
+    return lambda: data_pipeline.prepare_oc_table(ctx['df_oc_crudo'].copy())
+
+
+def _etapa_indices_filas(ctx):
+    return lambda: row_index.build_table_indexes(ctx['df_stock'], ctx['df_oc'], ctx['df_consumo'])
+
+
+def _etapa_cubo_demanda(ctx):
+    return lambda: build_demand_cube(ctx['df_consumo'])
+
+
+def _etapa_radar_par(ctx):
+    return lambda: radar_engine.compute_radar_kpis(
+        ctx['df_stock'], ctx['df_consumo'], ctx['df_oc'],
+        ctx['bodega_stock'], ctx['bodega_consumo'], LEAD_TIME, Z
+    )
+
+
+def _etapa_radar_par_cubo(ctx):
+    return lambda: radar_engine.compute_radar_kpis(
+        ctx['df_stock'], ctx['df_consumo'], ctx['df_oc'],
+        ctx['bodega_stock'], ctx['bodega_consumo'], LEAD_TIME, Z,
+        demand_cube=ctx['demand_cube']
+    )
+
+
+def _etapa_radar_matriz(ctx):
+    return lambda: radar_engine.compute_radar_matrix(
+        ctx['df_stock'], ctx['df_consumo'], ctx['df_oc'], LEAD_TIME, Z,
+        demand_cube=ctx['demand_cube']
+    )
+
+
+def _etapa_radar_matriz_sin_llegadas(ctx):
+    # Caso real: ninguna línea de OC con entrega futura (ventana vacía o todo entregado)
+    df_oc = ctx['df_oc'][ctx['df_oc']['Fecha de entrega de la línea'] < pd.Timestamp.now().floor('D')]
+    return lambda: radar_engine.compute_radar_matrix(
+        ctx['df_stock'], ctx['df_consumo'], df_oc, LEAD_TIME, Z,
+        demand_cube=ctx['demand_cube']
+    )
+
+
+def _simular_skus(ctx, **kwargs):
+    for sku in ctx['skus_muestra']:
+        simulator.run_inventory_simulation(
+            sku, ctx['bodega_stock'], ctx['bodega_consumo'],
+            ctx['df_stock'], ctx['df_consumo'], ctx['df_oc'],
+            DIAS_SIMULACION, LEAD_TIME, Z, **kwargs
+        )
+
+
+def _etapa_simulacion_sku(ctx):
+    return lambda: _simular_skus(ctx)
+
+
+def _etapa_simulacion_sku_indexada(ctx):
+    return lambda: _simular_skus(ctx, row_indexes=ctx['row_indexes'], demand_cube=ctx['demand_cube'])
+
+
+def _etapa_simulacion_portafolio(ctx):
+    return lambda: simulator.run_portfolio_simulation(
+        'all', ctx['bodega_stock'], ctx['bodega_consumo'],
+        ctx['df_stock'], ctx['df_consumo'], ctx['df_oc'],
+        DIAS_SIMULACION, LEAD_TIME, Z, demand_cube=ctx['demand_cube']
+    )
+
+
+def _etapa_monte_carlo(ctx):
+    llegadas = {pd.Timestamp.now().floor('D') + pd.Timedelta(days=d): 500.0 for d in (20, 45, 80)}
+    return lambda: simulator.run_monte_carlo_simulation(
+        1_000.0, llegadas, 12.0, 6.0, pd.Timestamp.now().floor('D'), DIAS_SIMULACION,
+        n_paths=TRAYECTORIAS_MONTE_CARLO, seed=0
+    )
+
+
+def _etapa_carga_excel(ctx):
+    """Carga completa ('data_pipeline.load_all_data') desde Excel sintéticos, sin y con caché."""
+    carpeta = Path(ctx['dir_excel'])
+
+    def correr():
+        with _directorio(carpeta):
+            return data_pipeline.load_all_data()
+    return correr
+
+
+ETAPAS = {
+    'preparacion_oc': _etapa_preparacion_oc,
+    'indices_filas': _etapa_indices_filas,
+    'cubo_demanda': _etapa_cubo_demanda,
+    'radar_par': _etapa_radar_par,
+    'radar_par_cubo': _etapa_radar_par_cubo,
+    'radar_matriz': _etapa_radar_matriz,
+    'radar_matriz_sin_llegadas': _etapa_radar_matriz_sin_llegadas,
+    'simulacion_sku': _etapa_simulacion_sku,
+    'simulacion_sku_indexada': _etapa_simulacion_sku_indexada,
+    'simulacion_portafolio': _etapa_simulacion_portafolio,
+    'monte_carlo': _etapa_monte_carlo,
+}
+
+
+# --- 2. Medición ---
+
+@contextlib.contextmanager
+def _directorio(ruta):
+    anterior = os.getcwd()
+    os.chdir(ruta)
+    try:
+        yield
+    finally:
+        os.chdir(anterior)
+
+
+def measure(funcion, repeticiones=3, medir_memoria=True):
+    """
+    Ejecuta 'funcion' varias veces y retorna tiempos (s) y memoria pico (MB).
+
+    La memoria se mide en una corrida aparte con 'tracemalloc' (cubre numpy y
+    pandas; no ve los buffers internos de pyarrow), para no inflar los tiempos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    pico_mb = None
+    if medir_memoria:
+        tracemalloc.start()
+        try:
+            funcion()
+            pico_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'segundos_min': min(tiempos),
+        'segundos_mediana': float(np.median(tiempos)),
+        'repeticiones': repeticiones,
+        'memoria_pico_mb': pico_mb,
+    }
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        sucio = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip() != ''
+        return commit, sucio
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def _build_context(parametros, seed, con_excel, filas_excel):
+    print(f"Generando datos sintéticos: {parametros} ...")
+    dataset = make_dataset(seed=seed, **parametros)
+
+    # Mismas tablas que ve la app: limpieza, tipos compactos (schema) y SKUs
+    # homogenizados, vía 'data_pipeline.prepare_tables'. La ventana parte en
+    # el primer consumo, para conservar toda la historia pedida.
+    desde = dataset['df_consumo']['FechaSolicitud'].min()
+    tablas = data_pipeline.prepare_tables(
+        dataset['df_stock'].copy(), dataset['df_oc'].copy(), dataset['df_consumo'].copy(),
+        dataset['df_residencial'], desde
+    )
+    ctx = dict(zip(TABLE_NAMES, tablas))
+    ctx['df_oc_crudo'] = dataset['df_oc']
+    ctx['bodega_stock'] = ctx['df_stock']['CodigoBodega'].iloc[0]
+    ctx['bodega_consumo'] = 'Bodega de Proyectos RE'
+
+    # Muestra de SKUs con consumo (los más y menos demandados)
+    skus = ctx['df_consumo']['CodigoArticulo'].value_counts().index
+    paso = max(len(skus) // SKUS_SIMULACION_INDIVIDUAL, 1)
+    ctx['skus_muestra'] = list(skus[::paso][:SKUS_SIMULACION_INDIVIDUAL])
+
+    if con_excel:
+        chico = make_dataset(
+            seed=seed, n_skus=min(parametros['n_skus'], 2_000),
+            n_bodegas_stock=parametros['n_bodegas_stock'], n_bodegas_consumo=parametros['n_bodegas_consumo'],
+            n_filas_consumo=filas_excel, meses_historia=parametros['meses_historia']
+        )
+        ctx['dir_excel'] = tempfile.mkdtemp(prefix='bench_excel_')
+        print(f"Escribiendo Excel sintéticos ({filas_excel} filas de consumo) en {ctx['dir_excel']} ...")
+        write_excel_files(chico, Path(ctx['dir_excel']) / 'data')
+    return ctx
+
+
+def run(parametros, etapas, seed=0, repeticiones=3, medir_memoria=True, con_excel=False, filas_excel=50_000):
+    """Corre las etapas pedidas y retorna el diccionario de resultados."""
+    ctx = _build_context(parametros, seed, con_excel, filas_excel)
+    resultados = {}
+
+    if con_excel:
+        # Primera carga (convierte a Parquet) y carga con la caché ya creada
+        correr = _etapa_carga_excel(ctx)
+        try:
+            resultados['carga_excel_fria'] = measure(correr, repeticiones=1, medir_memoria=False)
+            resultados['carga_excel_cache'] = measure(correr, repeticiones, medir_memoria)
+        finally:
+            shutil.rmtree(ctx['dir_excel'], ignore_errors=True)
+        for nombre in ('carga_excel_fria', 'carga_excel_cache'):
+            print(f"  {nombre:<26} {resultados[nombre]['segundos_min']:8.3f} s")
+
+    for nombre in etapas:
+        resultados[nombre] = measure(ETAPAS[nombre](ctx), repeticiones, medir_memoria)
+        r = resultados[nombre]
+        memoria = f"{r['memoria_pico_mb']:9.1f} MB" if r['memoria_pico_mb'] is not None else ''
+        print(f"  {nombre:<26} {r['segundos_min']:8.3f} s {memoria}")
+
+    commit, sucio = _git_commit()
+    return {
+        'commit': commit,
+        'commit_con_cambios': sucio,
+        'fecha': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'entorno': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+        },
+        'parametros': dict(parametros, seed=seed, filas_excel=filas_excel if con_excel else None),
+        'etapas': resultados,
+    }
+
+
+def save_results(resultados, directorio=RESULTS_DIR):
+    """Guarda los resultados como JSON '<fecha>_<commit>.json' y retorna la ruta."""
+    directorio.mkdir(parents=True, exist_ok=True)
+    sello = pd.Timestamp(resultados['fecha']).strftime('%Y%m%d-%H%M%S')
+    commit = (resultados['commit'] or 'sin-git')[:8]
+    ruta = directorio / f"{sello}_{commit}.json"
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    return ruta
+
+
+def compare(ruta_base, ruta_nueva, umbral=0.10):
+    """
+    Compara dos archivos de resultados etapa por etapa (tiempo mínimo y
+    memoria pico). Retorna True si alguna etapa empeoró más que 'umbral'.
+    """
+    with open(ruta_base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(ruta_nueva, encoding='utf-8') as f:
+        nueva = json.load(f)
+
+    if base['parametros'] != nueva['parametros']:
+        print("Aviso: los parámetros de ambas corridas no coinciden.")
+
+    print(f"{'etapa':<26} {'base (s)':>10} {'nueva (s)':>10} {'razón':>7} {'mem base':>10} {'mem nueva':>10}")
+    hay_regresion = False
+    for nombre, r_nueva in nueva['etapas'].items():
+        r_base = base['etapas'].get(nombre)
+        if r_base is None:
+            print(f"{nombre:<26} {'-':>10} {r_nueva['segundos_min']:10.3f}")
+            continue
+
+        razon = r_nueva['segundos_min'] / r_base['segundos_min'] if r_base['segundos_min'] > 0 else float('inf')
+        marca = ' <-- regresión' if razon > 1 + umbral else ''
+        hay_regresion |= bool(marca)
+
+        mem_base = r_base.get('memoria_pico_mb')
+        mem_nueva = r_nueva.get('memoria_pico_mb')
+        mem_base = f"{mem_base:10.1f}" if mem_base is not None else f"{'-':>10}"
+        mem_nueva = f"{mem_nueva:10.1f}" if mem_nueva is not None else f"{'-':>10}"
+        print(f"{nombre:<26} {r_base['segundos_min']:10.3f} {r_nueva['segundos_min']:10.3f} {razon:7.2f} {mem_base} {mem_nueva}{marca}")
+    return hay_regresion
+
+
+# --- 3. Línea de Comandos ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de los motores de abastecimiento con datos sintéticos.")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='pequeno')
+    parser.add_argument('--skus', type=int, help="SKUs distintos")
+    parser.add_argument('--bodegas-stock', type=int)
+    parser.add_argument('--bodegas-consumo', type=int)
+    parser.add_argument('--filas-consumo', type=int, help="Filas de ST_OWTR")
+    parser.add_argument('--filas-oc', type=int, help="Líneas de OPOR (por defecto 5 por SKU)")
+    parser.add_argument('--meses', type=int, help="Meses de historia de consumo")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--etapas', nargs='+', choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-memoria', action='store_true', help="No medir memoria pico (más rápido)")
+    parser.add_argument('--con-excel', action='store_true', help="Medir también la carga completa desde Excel sintéticos")
+    parser.add_argument('--filas-excel', type=int, default=50_000, help="Filas de consumo del Excel sintético")
+    parser.add_argument('--salida', type=Path, default=RESULTS_DIR, help="Carpeta de resultados")
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVA'), help="Compara dos archivos de resultados")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        return 1 if compare(*args.comparar) else 0
+
+    parametros = dict(PRESETS[args.preset])
+    for clave, valor in [
+        ('n_skus', args.skus), ('n_bodegas_stock', args.bodegas_stock),
+        ('n_bodegas_consumo', args.bodegas_consumo), ('n_filas_consumo', args.filas_consumo),
+        ('n_filas_oc', args.filas_oc), ('meses_historia', args.meses),
+    ]:
+        if valor is not None:
+            parametros[clave] = valor
+
+    resultados = run(
+        parametros, args.etapas, seed=args.seed, repeticiones=args.repeticiones,
+        medir_memoria=not args.sin_memoria, con_excel=args.con_excel, filas_excel=args.filas_excel
+    )
+    ruta = save_results(resultados, args.salida)
+    print(f"Resultados guardados en '{ruta}'.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
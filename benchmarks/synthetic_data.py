@@ -0,0 +1,121 @@
+# --- ARCHIVO: benchmarks/synthetic_data.py ---
+# (Generador de datos sintéticos con la forma de Stock / OPOR / ST_OWTR)
+
+import numpy as np
+import pandas as pd
+
+COMPRADORES = ['ACASTRO', 'BMUNOZ', 'CROJAS', 'DPEREZ', 'EGONZALEZ', 'FSOTO', 'GDIAZ', 'HVERA']
+COMENTARIOS = ['Reposición', 'Proyecto C&I', 'Urgente', 'PROA importación', None]
+
+
+def _sku_codes(n_skus):
+    return np.array([f"EXI-{i:06d}" for i in range(n_skus)], dtype=object)
+
+
+def _random_dates(rng, inicio, n_dias, n):
+    """'n' fechas uniformes en [inicio, inicio + n_dias)."""
+    offsets = rng.integers(0, max(n_dias, 1), n).astype('timedelta64[D]')
+    return pd.DatetimeIndex(np.datetime64(inicio, 'ns') + offsets)
+
+
+def make_dataset(
+    n_skus=1_000,
+    n_bodegas_stock=3,
+    n_bodegas_consumo=5,
+    n_filas_consumo=100_000,
+    n_filas_oc=None,
+    meses_historia=4,
+    seed=0,
+    today=None
+):
+    """
+    Genera tablas sintéticas con las columnas que usa la app.
+
+    - n_skus: SKUs distintos (la demanda se concentra en pocos, tipo Zipf)
+    - n_bodegas_stock / n_bodegas_consumo: bodegas de cada tabla
+    - n_filas_consumo: filas de ST_OWTR
+    - n_filas_oc: líneas de OPOR (por defecto 5 por SKU)
+    - meses_historia: meses de historia de consumo hacia atrás
+    - seed: semilla (mismo resultado para los mismos parámetros)
+
+    Retorna un diccionario con 'df_stock', 'df_oc', 'df_consumo' y
+    'df_residencial', con los mismos tipos que entrega la lectura de los Excel.
+    """
+    rng = np.random.default_rng(seed)
+    if today is None:
+        today = pd.Timestamp.now().floor('D')
+    if n_filas_oc is None:
+        n_filas_oc = 5 * n_skus
+
+    skus = _sku_codes(n_skus)
+    bodegas_stock = np.array([f"BF{i:04d}" for i in range(1, n_bodegas_stock + 1)], dtype=object)
+    bodegas_consumo = np.array(
+        ['Bodega de Proyectos RE'] + [f"Bodega {i}" for i in range(1, n_bodegas_consumo)], dtype=object
+    )[:n_bodegas_consumo]
+
+    # --- 1. Stock: ~60% de los pares (SKU, bodega) con saldo ---
+    pares = rng.random((n_skus, n_bodegas_stock)) < 0.6
+    sku_pos, bodega_pos = np.nonzero(pares)
+    df_stock = pd.DataFrame({
+        'CodigoArticulo': skus[sku_pos],
+        'NombreArticulo': np.char.add('Artículo ', skus[sku_pos].astype(str)).astype(object),
+        'CodigoBodega': bodegas_stock[bodega_pos],
+        'DisponibleParaPrometer': rng.integers(-5, 2_000, len(sku_pos)).astype(float),
+    })
+
+    # --- 2. Consumo (ST_OWTR): popularidad tipo Zipf ---
+    pesos = 1.0 / (np.arange(n_skus) + 10.0)
+    pesos /= pesos.sum()
+    inicio_historia = (today - pd.DateOffset(months=meses_historia)).replace(day=1)
+    n_dias = (today - inicio_historia).days + 1
+
+    df_consumo = pd.DataFrame({
+        'DocNum': np.sort(rng.integers(1, max(n_filas_consumo // 3, 2), n_filas_consumo)),
+        'CodigoArticulo': skus[rng.choice(n_skus, n_filas_consumo, p=pesos)],
+        'BodegaDestino_Requerida': bodegas_consumo[rng.integers(0, n_bodegas_consumo, n_filas_consumo)],
+        'FechaSolicitud': _random_dates(rng, inicio_historia, n_dias, n_filas_consumo),
+        'CantidadSolicitada': rng.integers(1, 50, n_filas_consumo).astype(float),
+    })
+
+    # --- 3. OC (OPOR): varias líneas por documento ---
+    inicio_oc = (today - pd.DateOffset(months=4)).replace(day=1)
+    n_dias_oc = (today - inicio_oc).days + 1
+    entrega = _random_dates(rng, today - pd.Timedelta(days=60), 260, n_filas_oc).to_series(index=range(n_filas_oc))
+    entrega[rng.random(n_filas_oc) < 0.1] = pd.NaT
+
+    df_oc = pd.DataFrame({
+        'Número de documento': 100_000_000 + np.sort(rng.integers(0, max(n_filas_oc // 4, 1), n_filas_oc)),
+        'Fecha de contabilización': _random_dates(rng, inicio_oc, n_dias_oc, n_filas_oc),
+        'Número de artículo': skus[rng.integers(0, n_skus, n_filas_oc)],
+        'Cantidad': rng.integers(-2, 300, n_filas_oc).astype(float),
+        'Fecha de entrega de la línea': entrega.to_numpy(),
+        'Creador': np.array(COMPRADORES, dtype=object)[rng.integers(0, len(COMPRADORES), n_filas_oc)],
+        'Total_Linea': rng.integers(1_000, 5_000_000, n_filas_oc).astype(float),
+        'Comentarios': np.array(COMENTARIOS, dtype=object)[rng.integers(0, len(COMENTARIOS), n_filas_oc)],
+    })
+
+    # --- 4. Maestro residencial (no lo usan los motores, solo se carga) ---
+    df_residencial = pd.DataFrame({
+        'CodigoArticulo': skus[: min(n_skus, 500)],
+        'Categoria': 'Residencial',
+    })
+
+    return {
+        'df_stock': df_stock,
+        'df_oc': df_oc,
+        'df_consumo': df_consumo,
+        'df_residencial': df_residencial,
+    }
+
+
+def write_excel_files(dataset, carpeta):
+    """
+    Escribe el dataset como los Excel de 'data/' (Stock, OPOR, ST_OWTR y
+    BD_Master_Residencial) dentro de 'carpeta'. Solo para tamaños chicos:
+    escribir Excel es lento.
+    """
+    carpeta.mkdir(parents=True, exist_ok=True)
+    dataset['df_stock'].to_excel(carpeta / 'Stock.xlsx', index=False)
+    dataset['df_oc'].to_excel(carpeta / 'OPOR.xlsx', index=False)
+    dataset['df_consumo'].to_excel(carpeta / 'ST_OWTR.xlsx', index=False)
+    dataset['df_residencial'].to_excel(carpeta / 'BD_Master_Residencial.xlsx', index=False)
@@ -14,6 +14,10 @@ if src_path not in sys.path:
     sys.path.append(src_path)
 
 import data_loader 
+import ui_helpers # Versión de los datos
+import config
+import engine_cache # Cubo de KPIs por versión de datos
+import buyer_rollup
 
 # --- 2. Configuración de la Página ---
 st.set_page_config(
@@ -23,11 +27,8 @@ st.set_page_config(
 )
 
 # --- 3. Carga y Verificación de Datos ---
-# Nos aseguramos de que los datos estén cargados en la sesión
-if 'data_loaded' not in st.session_state:
-    st.info("Cargando datos... por favor, espere.")
-    # Intenta cargar los datos si no están (aunque app.py ya deberia haberlo hecho)
-    data_loader.load_data_into_session()
+# Enlaza la versión vigente de los datos compartidos (si no cambió, no hace nada)
+data_loader.load_data_into_session()
 
 # Si, después de intentar, sigue sin datos, detenemos.
 if 'data_loaded' not in st.session_state:
@@ -36,13 +37,18 @@ if 'data_loaded' not in st.session_state:
 
 # Accedemos a los datos desde la sesión
 try:
-    df_oc = st.session_state.df_oc.copy()
+    # Vista copy-on-write de la tabla compartida (ver 'data_store.py'): sin .copy()
+    df_oc = st.session_state.df_oc
     
     # --- Verificación de Columnas (Añadido 'Comentarios') ---
     columnas_necesarias = ['Creador', 'Fecha de contabilización', 'Número de documento', 'Total_Linea', 'Comentarios']
     if not all(col in df_oc.columns for col in columnas_necesarias):
         st.error(f"Error: El archivo 'OPOR.xlsx' no contiene las columnas necesarias: {columnas_necesarias}")
         st.stop()
+
+    # Cubo (Creador x día), construido una vez por versión de datos:
+    # los filtros se resuelven sobre él, sin recorrer las líneas de OC
+    rollup = engine_cache.get_buyer_rollup(st.session_state.data_version, df_oc)
         
 except AttributeError:
     st.error("Error al acceder a 'df_oc' en st.session_state. Vuelva al 'Menú' principal.")
@@ -56,6 +62,7 @@ except Exception as e:
 st.image("assets/COPEC-FLUX.svg", width=150)
 st.title("📊 KPIs del Equipo de Abastecimiento")
 st.markdown("Análisis del rendimiento de los compradores basado en Órdenes de Compra (OC).")
+ui_helpers.display_data_version()
 
 st.markdown("---")
 
@@ -63,7 +70,7 @@ st.markdown("---")
 st.sidebar.header("Filtros del Dashboard")
 
 # Obtener lista de compradores únicos
-lista_compradores = df_oc['Creador'].unique()
+lista_compradores = rollup['compradores']
 compradores_seleccionados = st.sidebar.multiselect(
     "Seleccione Comprador(es)",
     options=lista_compradores,
@@ -71,8 +78,8 @@ compradores_seleccionados = st.sidebar.multiselect(
 )
 
 # Filtro de Rango de Fechas
-min_fecha = df_oc['Fecha de contabilización'].min().date()
-max_fecha = df_oc['Fecha de contabilización'].max().date()
+min_fecha = rollup['fecha_min'].date()
+max_fecha = rollup['fecha_max'].date()
 
 fecha_inicio, fecha_fin = st.sidebar.date_input(
     "Seleccione Rango de Fechas",
@@ -82,6 +89,13 @@ fecha_inicio, fecha_fin = st.sidebar.date_input(
     format="DD/MM/YYYY"
 )
 
+# Conteo de OCs únicas: aproximado (sketches por comprador/día) o exacto (auditoría)
+conteo_exacto = st.sidebar.toggle(
+    "Conteo exacto de OCs (auditoría)",
+    value=config.BUYER_KPI_EXACT_COUNTS,
+    help="Desactivado: OCs únicas estimadas con HyperLogLog (error típico ~3%)."
+)
+
 # --- 6. Aplicación de Filtros y Correcciones ---
 if not compradores_seleccionados:
     st.warning("Por favor, seleccione al menos un comprador en el filtro lateral.")
@@ -91,19 +105,10 @@ if not compradores_seleccionados:
 fecha_inicio_ts = pd.to_datetime(fecha_inicio)
 fecha_fin_ts = pd.to_datetime(fecha_fin)
 
-# Filtrar el DataFrame
-df_filtrado = df_oc[
-    (df_oc['Creador'].isin(compradores_seleccionados)) &
-    (df_oc['Fecha de contabilización'] >= fecha_inicio_ts) &
-    (df_oc['Fecha de contabilización'] <= fecha_fin_ts)
-].copy() # <--- *** CORRECCIÓN 1: Se añade .copy() para evitar SettingWithCopyWarning ***
+# KPIs del filtro, leídos del cubo
+kpis = buyer_rollup.buyer_totals(rollup, compradores_seleccionados, fecha_inicio_ts, fecha_fin_ts, conteo_exacto)
 
-# --- CORRECCIÓN 2: Forzar 'Comentarios' a string para evitar ArrowTypeError ---
-# Esto convierte todos los valores (incluyendo números) a texto y rellena vacíos.
-df_filtrado['Comentarios'] = df_filtrado['Comentarios'].astype(str).fillna('')
-
-
-if df_filtrado.empty:
+if kpis['lineas'] == 0:
     st.warning("No se encontraron datos para los filtros seleccionados.")
     st.stop()
 
@@ -113,15 +118,15 @@ st.header("Métricas Globales (filtradas)")
 col1, col2, col3 = st.columns(3)
 
 # KPI 1: Monto Total Comprado
-monto_total = df_filtrado['Total_Linea'].sum()
+monto_total = kpis['monto_total']
 col1.metric("Monto Total Comprado", f"${monto_total:,.0f} CLP")
 
 # KPI 2: OCs Únicas Generadas
-ocs_unicas = df_filtrado['Número de documento'].nunique()
-col2.metric("Nº OCs Únicas Generadas", f"{ocs_unicas}")
+ocs_unicas = kpis['ocs_unicas']
+col2.metric("Nº OCs Únicas Generadas", f"{ocs_unicas}" if conteo_exacto else f"~{ocs_unicas}")
 
 # KPI 3: Compradores Activos
-compradores_activos = df_filtrado['Creador'].nunique()
+compradores_activos = kpis['compradores_activos']
 col3.metric("Compradores Activos (en filtro)", f"{compradores_activos}")
 
 st.markdown("---")
@@ -129,12 +134,9 @@ st.markdown("---")
 # --- 8. Visualizaciones ---
 st.header("Análisis Visual")
 
-# Preparar datos para gráficos mensuales
-# (Esto ya no dará el Warning gracias al .copy() de arriba)
-df_filtrado['Año-Mes'] = df_filtrado['Fecha de contabilización'].dt.to_period('M').astype(str)
-
-# Agrupar por mes y comprador para los gráficos mensuales
-df_mensual_monto = df_filtrado.groupby(['Año-Mes', 'Creador'])['Total_Linea'].sum().reset_index()
+# Agregados por mes y comprador para los gráficos mensuales (desde el cubo)
+df_mensual = buyer_rollup.buyer_monthly(rollup, compradores_seleccionados, fecha_inicio_ts, fecha_fin_ts, conteo_exacto)
+df_mensual_monto = df_mensual[['Año-Mes', 'Creador', 'Total_Linea']]
 
 
 # --- Gráfico 1: Compras Mensuales (Monto) - Líneas ---
@@ -180,10 +182,8 @@ with st.container(border=True):
 with st.container(border=True):
     st.subheader("OCs Únicas Mensuales - Barras Apiladas")
     
-    # Agrupar por mes y comprador, contando OCs únicas
-    df_mensual_ocs = df_filtrado.groupby(['Año-Mes', 'Creador']).agg(
-        Conteo_OCs=('Número de documento', 'nunique')
-    ).reset_index()
+    # OCs únicas por mes y comprador (desde el cubo)
+    df_mensual_ocs = df_mensual[['Año-Mes', 'Creador', 'Conteo_OCs']]
     
     chart_barra_ocs_mensual = alt.Chart(df_mensual_ocs).mark_bar().encode(
         # Ejes X e Y
@@ -206,11 +206,8 @@ with st.container(border=True):
 with st.container(border=True):
     st.subheader("Total OCs Únicas Generadas por Comprador")
     
-    # Agrupar por comprador para KPIs
-    df_kpi_comprador = df_filtrado.groupby('Creador').agg(
-        Monto_Total=('Total_Linea', 'sum'),
-        OCs_Unicas=('Número de documento', 'nunique')
-    ).reset_index().sort_values(by='OCs_Unicas', ascending=False)
+    # KPIs por comprador (desde el cubo)
+    df_kpi_comprador = buyer_rollup.buyer_summary(rollup, compradores_seleccionados, fecha_inicio_ts, fecha_fin_ts, conteo_exacto)
     
     chart_barra_ocs = alt.Chart(df_kpi_comprador).mark_bar().encode(
         x=alt.X('OCs_Unicas', title='Cantidad de OCs Únicas'),
@@ -247,6 +244,13 @@ with st.container(border=True):
     st.altair_chart(chart_barra_monto, use_container_width=True)
 
 # --- 9. Vista de Datos (Detalle) ---
-with st.expander("Ver tabla de datos filtrados"):
-    # Esto ya no dará error gracias a la corrección de 'Comentarios'
+# Las líneas de OC solo se filtran si se pide el detalle
+if st.toggle("Ver tabla de datos filtrados"):
+    df_filtrado = df_oc[
+        (df_oc['Creador'].isin(compradores_seleccionados)) &
+        (df_oc['Fecha de contabilización'] >= fecha_inicio_ts) &
+        (df_oc['Fecha de contabilización'] < fecha_fin_ts + pd.Timedelta(days=1))
+    ]
+    # Forzar 'Comentarios' a string para evitar ArrowTypeError
+    df_filtrado = df_filtrado.assign(Comentarios=df_filtrado['Comentarios'].astype(str).fillna(''))
     st.dataframe(df_filtrado)
\ No newline at end of file
@@ -12,15 +12,20 @@ if src_path not in sys.path:
     sys.path.append(src_path)
 
 import ui_helpers     # Importa las funciones de gráficos y métricas
-import data_loader    # Importamos esto solo por si acaso, pero los datos ya están cargados
+import engine_cache   # Índice de llegadas y catálogo de SKUs por versión de datos
+import data_loader    # Datos compartidos (versión vigente)
 
 # --- 1. Título de la Página ---
 st.title("Consulta de Próximas Llegadas 📦")
 
-# Verifica si los datos están cargados (deben haber sido cargados por app.py)
+# Enlaza la versión vigente de los datos compartidos (si no cambió, no hace nada)
+data_loader.load_data_into_session()
+
+# Verifica si los datos están cargados
 if 'data_loaded' not in st.session_state or not st.session_state.data_loaded:
     st.error("Los datos no se han cargado. Por favor, vuelva al Menú Principal e inténtelo de nuevo.")
     st.stop()
+ui_helpers.display_data_version()
 
 # --- 2. Acceder a los Datos desde st.session_state ---
 df_stock = st.session_state.df_stock
@@ -29,12 +34,9 @@ df_consumo = st.session_state.df_consumo
 
 # --- 3. Crear Selectores de Filtro ---
 
-# Listas para el selector de SKU
-lista_skus_stock = df_stock['CodigoArticulo'].dropna().unique()
-lista_skus_consumo = df_consumo['CodigoArticulo'].dropna().unique()
-all_skus = sorted(list(set(lista_skus_stock) | set(lista_skus_consumo)))
-
-opciones_selector_sku, mapa_nombres, _ = ui_helpers.create_sku_options(all_skus, df_stock)
+# Catálogo de SKUs (opciones "SKU | Nombre"), cacheado por versión de datos
+catalogo_skus = engine_cache.get_sku_catalog(st.session_state.data_version, df_stock, df_consumo)
+opciones_selector_sku, mapa_nombres = catalogo_skus.opciones, catalogo_skus.mapa_nombres
 
 # Añadimos la opción "Todas" al selector de SKU
 opciones_con_todas = ["Todas"] + opciones_selector_sku
@@ -63,39 +65,17 @@ st.markdown("---")
 # --- 4. Filtrar y Mostrar OCs ---
 today = pd.Timestamp.now().floor('D')
 
-# Limpiamos las fechas y cantidades de OC
-df_oc_clean = df_oc.copy()
-try:
-    df_oc_clean['Fecha de entrega de la línea'] = pd.to_datetime(df_oc_clean['Fecha de entrega de la línea'], format='%Y-m-%d', errors='coerce')
-    df_oc_clean['Cantidad'] = pd.to_numeric(df_oc_clean['Cantidad'], errors='coerce')
-except Exception as e:
-    st.error(f"Error procesando datos de OC: {e}")
-    st.stop()
+# Índice de llegadas (ordenado por fecha, por SKU y por n-gramas del N° de
+# documento), construido una vez por versión de datos: los filtros no
+# recorren la tabla de OC.
+indice_llegadas = engine_cache.get_arrivals_index(st.session_state.data_version, df_oc)
 
-# Convertimos la OC a string para permitir la búsqueda parcial
-df_oc_clean['Número de documento'] = df_oc_clean['Número de documento'].astype(str)
-
-# Empezamos con el filtro base (futuras y con cantidad)
-df_llegadas_detalle = df_oc_clean[
-    (df_oc_clean['Cantidad'] > 0) & 
-    (df_oc_clean['Fecha de entrega de la línea'] >= today)  
-].copy() # Hacemos una copia para evitar SettingWithCopyWarning
-
-# Aplicamos el filtro de SKU si no es "Todas"
-if sku_seleccionado != "Todas":
-    df_llegadas_detalle = df_llegadas_detalle[
-        df_llegadas_detalle['Número de artículo'] == sku_seleccionado
-    ]
-
-# Aplicamos el filtro de OC si se escribió algo
-if oc_buscada:
-    df_llegadas_detalle = df_llegadas_detalle[
-        df_llegadas_detalle['Número de documento'].str.contains(
-            oc_buscada, 
-            case=False, # Ignora mayúsculas/minúsculas
-            na=False    # Trata los NaN como si no coincidieran
-        )
-    ]
+# Futuras y con cantidad; filtro de SKU (si no es "Todas") y de OC (búsqueda parcial)
+df_llegadas_detalle = indice_llegadas.query(
+    sku=None if sku_seleccionado == "Todas" else sku_seleccionado,
+    desde=today,
+    documento=oc_buscada
+)
 
 # --- 5. Mostrar DataFrame ---
 if df_llegadas_detalle.empty:
@@ -103,7 +83,7 @@ if df_llegadas_detalle.empty:
 else:
     # Validamos que las columnas existan
     if 'Comentarios' not in df_llegadas_detalle.columns:
-            df_llegadas_detalle['Comentarios'] = 'N/A' 
+            df_llegadas_detalle = df_llegadas_detalle.assign(Comentarios='N/A')
                 
     if 'Número de documento' not in df_llegadas_detalle.columns:
             st.error("Columna 'Número de documento' (OC) no encontrada en OPOR.xlsx")
@@ -119,7 +99,7 @@ else:
     ]].copy()
     
     # Agregamos el nombre del artículo usando el mapa
-    df_display['Nombre Artículo'] = df_display['Número de artículo'].map(mapa_nombres).fillna('Nombre no encontrado')
+    df_display['Nombre Artículo'] = df_display['Número de artículo'].astype(str).map(mapa_nombres).fillna('Nombre no encontrado')
     
     # Reordenamos y Renombramos
     df_display = df_display[[
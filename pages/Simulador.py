@@ -13,12 +13,17 @@ if src_path not in sys.path:
 
 import config         # Importa constantes
 import simulator      # Importa el motor de simulación
+import engine_cache   # Simulación con caché de resultados y catálogo de SKUs
 import ui_helpers     # Importa las funciones de gráficos y métricas
+import data_loader    # Datos compartidos (versión vigente)
 import altair as alt  # Importamos Altair
 
 # --- 1. LÓGICA DE LA PÁGINA DEL SIMULADOR ---
 
-# Verifica si los datos están cargados (deben haber sido cargados por app.py)
+# Enlaza la versión vigente de los datos compartidos (si no cambió, no hace nada)
+data_loader.load_data_into_session()
+
+# Verifica si los datos están cargados
 if 'data_loaded' not in st.session_state or not st.session_state.data_loaded:
     st.error("Los datos no se han cargado. Por favor, vuelva al Menú Principal e inténtelo de nuevo.")
     st.stop()
@@ -26,6 +31,7 @@ if 'data_loaded' not in st.session_state or not st.session_state.data_loaded:
 # --- Configuración de Idioma y Título del Simulador ---
 ui_helpers.setup_locale() # Configura meses en español
 st.title("Simulador de Proyección de Inventario 📈")
+ui_helpers.display_data_version()
 
 st.sidebar.markdown("---") # Separador
 
@@ -34,27 +40,46 @@ st.sidebar.markdown("---") # Separador
 df_stock = st.session_state.df_stock
 df_oc = st.session_state.df_oc
 df_consumo = st.session_state.df_consumo
-# df_residencial no se usa en esta página, pero está disponible si se necesita
+row_indexes = st.session_state.row_indexes # Índices por (SKU, bodega)
+demand_cube = st.session_state.demand_cube # Demanda mensual precalculada
+# df_residencial no se usa en esta página; es una tabla bajo demanda (ver "lazy_table.py")
 
 # --- 3. Construcción de la Barra Lateral (Sidebar) ---
 st.sidebar.header("Configuración de Simulación")
 
 # --- Listas para selectores ---
-lista_skus_stock = df_stock['CodigoArticulo'].dropna().unique()
-lista_skus_consumo = df_consumo['CodigoArticulo'].dropna().unique()
-all_skus = sorted(list(set(lista_skus_stock) | set(lista_skus_consumo)))
-
 lista_bodegas_stock = sorted(df_stock['CodigoBodega'].dropna().unique())
 lista_bodegas_consumo = sorted(df_consumo['BodegaDestino_Requerida'].dropna().unique())
 
-# --- Requerimiento 2: Selector de SKU (usando ui_helper) ---
-opciones_selector_sku, mapa_nombres, default_index = ui_helpers.create_sku_options(all_skus, df_stock)
+# --- Requerimiento 2: Selector de SKU (catálogo cacheado por versión de datos) ---
+catalogo_skus = engine_cache.get_sku_catalog(st.session_state.data_version, df_stock, df_consumo)
+mapa_nombres = catalogo_skus.mapa_nombres
+
+# Búsqueda opcional: acota las opciones del selector (prefijo, subcadena o similitud)
+texto_busqueda_sku = st.sidebar.text_input(
+    "Buscar SKU (código o nombre):",
+    help="Acota la lista del selector. Admite varias palabras y tolera errores de tipeo."
+)
+opciones_selector_sku = catalogo_skus.opciones
+default_index = catalogo_skus.default_index
+if texto_busqueda_sku.strip():
+    coincidencias = catalogo_skus.search(texto_busqueda_sku)
+    if coincidencias:
+        opciones_selector_sku = coincidencias
+        default_index = 0
+    else:
+        # Sin coincidencias: se mantiene el SKU elegido antes (o el por defecto)
+        st.sidebar.warning("Sin coincidencias para la búsqueda. Se mantiene el SKU seleccionado.")
+        sku_anterior = st.session_state.get('simulador_sku_opcion')
+        if sku_anterior in opciones_selector_sku:
+            default_index = opciones_selector_sku.index(sku_anterior)
 
 sku_seleccionado_formateado = st.sidebar.selectbox(
     "1. Seleccione un SKU (busque por código o nombre):",
-    opciones_selector_sku, 
+    opciones_selector_sku,
     index=default_index
 )
+st.session_state.simulador_sku_opcion = sku_seleccionado_formateado
 sku_seleccionado = sku_seleccionado_formateado.split(" | ")[0]
 
 # --- Otros Selectores ---
@@ -84,22 +109,38 @@ lead_time_days = st.sidebar.number_input("5. Lead Time (Días):", min_value=1, m
 
 dias_a_simular = st.sidebar.number_input("6. Días a Simular:", min_value=30, max_value=365, value=100)
 
+st.sidebar.markdown("---")
+
+# --- Simulación Monte Carlo (opcional) ---
+usar_monte_carlo = st.sidebar.checkbox(
+    "7. Simulación Monte Carlo (bandas de incertidumbre)",
+    value=False,
+    help="Sortea miles de trayectorias de demanda usando la desviación estándar histórica."
+)
+if usar_monte_carlo:
+    n_trayectorias = st.sidebar.number_input("Nº de trayectorias:", min_value=100, max_value=50000, value=10000, step=1000)
+    semilla = st.sidebar.number_input("Semilla (reproducible):", min_value=0, value=42)
+
 
 # --- 4. Disparador de Ejecución ---
 if st.sidebar.button("🚀 Ejecutar Simulación", type="primary"):
     with st.spinner("Calculando simulación..."):
         
         # --- A. Ejecutar Simulación ---
-        df_sim, metrics, llegadas_map, df_llegadas_detalle = simulator.run_inventory_simulation(
+        # (Cacheada: repetir un SKU con los mismos parámetros no recalcula)
+        df_sim, metrics, llegadas_map, df_llegadas_detalle = engine_cache.run_inventory_simulation(
             sku_to_simulate=sku_seleccionado,
             warehouse_code=bodega_stock_sel,
             consumption_warehouse=bodega_consumo_sel,
-            df_stock_raw=df_stock,  # Pasando el df desde session_state
-            df_consumo_raw=df_consumo, # Pasando el df desde session_state
-            df_oc_raw=df_oc,       # Pasando el df desde session_state
             simulation_days=dias_a_simular,
             lead_time_days=lead_time_days,
-            service_level_z=service_level_z
+            service_level_z=service_level_z,
+            data_version=st.session_state.data_version,
+            df_stock=df_stock,  # Pasando el df desde session_state
+            df_consumo=df_consumo, # Pasando el df desde session_state
+            df_oc=df_oc,       # Pasando el df desde session_state
+            row_indexes=row_indexes,
+            demand_cube=demand_cube
         )
         
         # --- B. Mostrar Métricas ---
@@ -128,6 +169,21 @@ if st.sidebar.button("🚀 Ejecutar Simulación", type="primary"):
         )
         st.altair_chart(fig, use_container_width=True)
         
+        # --- E2. Simulación Monte Carlo (opcional) ---
+        if usar_monte_carlo:
+            df_bandas, mc_metrics = simulator.run_monte_carlo_simulation(
+                initial_stock=metrics['initial_stock'],
+                llegadas_map=llegadas_map,
+                daily_demand_mean=metrics['daily_demand_mean'],
+                daily_demand_std=metrics['daily_demand_std'],
+                start_date=df_sim.index[0],
+                simulation_days=dias_a_simular,
+                n_paths=int(n_trayectorias),
+                seed=int(semilla)
+            )
+            ui_helpers.display_monte_carlo_results(df_bandas, mc_metrics, metrics, sku_name, dias_a_simular)
+            st.markdown("---")
+        
         # --- F. Mostrar Tabla Fin de Mes (Req. 3) ---
         df_tabla_resultados = ui_helpers.prepare_end_of_month_table(df_sim)
         st.subheader("Stock Simulado a Fin de Mes")
@@ -135,4 +191,11 @@ if st.sidebar.button("🚀 Ejecutar Simulación", type="primary"):
         
 else:
     # Mensaje de bienvenida inicial
-    st.info("Ajuste los parámetros en la barra lateral y presione 'Ejecutar Simulación'")
\ No newline at end of file
+    st.info("Ajuste los parámetros en la barra lateral y presione 'Ejecutar Simulación'")
+
+# --- 5. Estado del Caché de Simulaciones ---
+cache_stats = engine_cache.get_simulation_cache().stats()
+st.sidebar.caption(
+    f"Caché de simulaciones: {cache_stats['hits']} aciertos · {cache_stats['misses']} cálculos "
+    f"({cache_stats['entries']} guardadas)"
+)
@@ -13,7 +13,9 @@ if src_path not in sys.path:
 
 import config
 import radar_engine # <-- Importamos nuestro nuevo motor
+import engine_cache # Versiones cacheadas (st.cache_data) del motor
 import ui_helpers # Para la barra lateral (si la tienes personalizada)
+import data_loader # Datos compartidos (versión vigente)
 
 # --- 1. Configuración de Página ---
 st.set_page_config(layout="wide", page_title="Radar de Inventario")
@@ -24,14 +26,19 @@ st.markdown("Visión general del estado del inventario para priorizar acciones."
 # ui_helpers.add_sidebar_navigation() 
 
 # --- 2. Verificar Carga de Datos ---
+# Enlaza la versión vigente de los datos compartidos (si no cambió, no hace nada)
+data_loader.load_data_into_session()
+
 if 'data_loaded' not in st.session_state or not st.session_state.data_loaded:
     st.error("Los datos no se han cargado. Por favor, vuelva al Menú Principal e inténtelo de nuevo.")
     st.stop()
+ui_helpers.display_data_version()
 
 # --- 3. Acceder a los Datos desde st.session_state ---
 df_stock = st.session_state.df_stock
 df_oc = st.session_state.df_oc
 df_consumo = st.session_state.df_consumo
+demand_cube = st.session_state.demand_cube # Demanda mensual precalculada
 
 # --- 4. Controles de Simulación (en la página principal) ---
 st.subheader("Parámetros del Reporte")
@@ -64,19 +71,27 @@ with col4:
     lead_time_days = st.number_input("Lead Time (Días) (para ROP):", min_value=1, max_value=120, value=90)
 
 # --- 5. Botón de Ejecución ---
+# La matriz se calcula para TODAS las bodegas a la vez (cacheada por LT y nivel
+# de servicio); cambiar de bodega después solo hace un slice.
 if st.button("🚀 Generar Reporte de Radar", type="primary", width='stretch'):
+    st.session_state.radar_activo = True
+
+if st.session_state.get('radar_activo', False):
     
-    with st.spinner("Calculando KPIs para todos los SKUs... Esto puede tardar un momento."):
-        df_radar = radar_engine.run_full_radar_analysis(
+    with ui_helpers.streamlit_progress("Calculando KPIs para todos los SKUs y bodegas... Esto puede tardar un momento.") as avance:
+        df_matriz = engine_cache.run_radar_matrix(
             df_stock,
             df_consumo,
             df_oc,
-            bodega_stock_sel,
-            bodega_consumo_sel,
             lead_time_days,
-            service_level_z
+            service_level_z,
+            data_version=st.session_state.data_version,
+            _demand_cube=demand_cube,
+            _progress=avance
         )
 
+    df_radar = radar_engine.slice_radar_matrix(df_matriz, bodega_stock_sel, bodega_consumo_sel)
+
     if df_radar.empty:
         st.warning("No se encontraron datos para los parámetros seleccionados.")
     else:
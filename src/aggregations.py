@@ -0,0 +1,135 @@
+# --- ARCHIVO: src/aggregations.py ---
+# (NUEVO ARCHIVO: agregaciones por grupo compartidas por el radar y el simulador)
+
+import pandas as pd
+import numpy as np
+
+
+def _numeric(serie):
+    """La serie como número; si ya es numérica (ver 'schema.py') no se convierte de nuevo."""
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie
+    return pd.to_numeric(serie, errors='coerce')
+
+
+def initial_stock_by(df_stock, keys):
+    """
+    Stock inicial (suma de 'DisponibleParaPrometer') por cada combinación de 'keys'.
+    """
+    disponible = _numeric(df_stock['DisponibleParaPrometer'])
+    return disponible.groupby([df_stock[k] for k in keys], observed=True).sum()
+
+
+def monthly_demand_by(df_consumo, keys):
+    """
+    Consumo mensual ('CantidadSolicitada') por cada combinación de 'keys'.
+
+    Retorna una Serie indexada por 'keys' + 'Mes' (inicio de mes). Solo
+    contiene los meses con movimientos.
+    """
+    cantidad = _numeric(df_consumo['CantidadSolicitada'])
+    meses = pd.Series(
+        df_consumo['FechaSolicitud'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]').astype('datetime64[ns]'),
+        index=df_consumo.index, name='Mes'
+    )
+    return cantidad.groupby([df_consumo[k] for k in keys] + [meses], observed=True).sum()
+
+
+def demand_stats_by(df_consumo, keys, today, mensual=None):
+    """
+    Media y desviación estándar de la demanda mensual por cada combinación de 'keys'.
+
+    Replica el 'resample("MS")' por SKU: cada grupo cubre desde su primer hasta
+    su último mes con datos (los meses sin consumo cuentan como 0) y solo se
+    usan los meses completos (anteriores al mes actual).
+
+    'mensual' permite reutilizar el resultado de 'monthly_demand_by'.
+
+    Retorna un DataFrame indexado por 'keys' con columnas:
+    - monthly_mean, monthly_std (0.0 si hay un solo mes), n_meses
+    """
+    columnas = ['monthly_mean', 'monthly_std', 'n_meses']
+    if mensual is None:
+        mensual = monthly_demand_by(df_consumo, keys)
+    if mensual.empty:
+        return pd.DataFrame(columns=columnas, dtype=float)
+
+    # Mes de cada grupo como entero (meses desde 1970)
+    mes_col = mensual.index.get_level_values('Mes').values.astype('datetime64[M]').astype(np.int64)
+    mes_actual = np.datetime64(today, 'M').astype(np.int64)
+
+    codigos, grupos = mensual.index.droplevel('Mes').factorize()
+    grupos = grupos.set_names(keys)
+    mes_min = mes_col.min()
+    n_grupos, n_meses_total = len(grupos), mes_col.max() - mes_min + 1
+
+    # Matriz densa (grupo x mes) con 0 en los meses sin consumo
+    matriz = np.zeros((n_grupos, n_meses_total), dtype=np.float64)
+    matriz[codigos, mes_col - mes_min] = mensual.to_numpy(dtype=np.float64)
+
+    primer_mes = np.full(n_grupos, np.iinfo(np.int64).max)
+    ultimo_mes = np.full(n_grupos, np.iinfo(np.int64).min)
+    np.minimum.at(primer_mes, codigos, mes_col)
+    np.maximum.at(ultimo_mes, codigos, mes_col)
+
+    # Meses válidos: dentro del rango de datos del grupo y anteriores al mes actual
+    rango_meses = np.arange(mes_min, mes_min + n_meses_total)
+    validos = (
+        (rango_meses[None, :] >= primer_mes[:, None]) &
+        (rango_meses[None, :] <= np.minimum(ultimo_mes, mes_actual - 1)[:, None])
+    )
+    n_validos = validos.sum(axis=1)
+    valores = np.where(validos, matriz, 0.0)
+
+    # Mismas fórmulas que Series.mean() / Series.std() (ddof=1) sobre cada fila
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = valores.sum(axis=1) / n_validos
+        desvios = np.where(validos, (media[:, None] - valores) ** 2, 0.0)
+        desv_std = np.sqrt(desvios.sum(axis=1) / (n_validos - 1))
+
+    stats = pd.DataFrame({
+        'monthly_mean': np.where(n_validos > 0, media, 0.0),
+        'monthly_std': np.where(n_validos > 1, desv_std, 0.0),
+        'n_meses': n_validos,
+    }, index=grupos)
+    return stats
+
+
+def future_arrivals_by_date(df_oc, today):
+    """
+    Unidades por llegar (OC con cantidad > 0 y entrega >= hoy).
+
+    Retorna una Serie indexada por ('Número de artículo', 'Fecha de entrega de la línea').
+    """
+    df_llegadas = df_oc[
+        (df_oc['Cantidad'] > 0) &
+        (df_oc['Fecha de entrega de la línea'] >= today)
+    ]
+    return df_llegadas.groupby(
+        ['Número de artículo', 'Fecha de entrega de la línea'], observed=True
+    )['Cantidad'].sum()
+
+
+def arrivals_by_sku(df_oc, today, lead_time_days, por_fecha=None):
+    """
+    Llegadas futuras de OC por SKU.
+
+    'por_fecha' permite reutilizar el resultado de 'future_arrivals_by_date'.
+
+    Retorna un DataFrame indexado por SKU con columnas:
+    - llegadas_en_lt: unidades que llegan hasta 'today + lead_time_days'
+    - proxima_llegada: fecha (str 'YYYY-MM-DD') de la próxima llegada
+    """
+    if por_fecha is None:
+        por_fecha = future_arrivals_by_date(df_oc, today)
+
+    forecast_date = today + pd.DateOffset(days=lead_time_days)
+    fechas = por_fecha.index.get_level_values('Fecha de entrega de la línea')
+
+    llegadas_en_lt = por_fecha[fechas <= forecast_date].groupby(level=0, observed=True).sum()
+    proxima_llegada = por_fecha.reset_index(level=1)['Fecha de entrega de la línea'].groupby(level=0, observed=True).min()
+
+    return pd.DataFrame({
+        'llegadas_en_lt': llegadas_en_lt.reindex(proxima_llegada.index, fill_value=0.0),
+        'proxima_llegada': proxima_llegada.dt.strftime('%Y-%m-%d'),
+    })
@@ -0,0 +1,114 @@
+# --- ARCHIVO: src/arrivals_index.py ---
+# (NUEVO ARCHIVO: índice de llegadas de OC por fecha, SKU y N° de documento)
+
+import numpy as np
+import pandas as pd
+
+# Largo máximo de los n-gramas del índice de N° de documento (se indexan
+# los de largo 1..NGRAM: una búsqueda corta es una sola consulta al índice)
+NGRAM = 3
+
+# Columnas de la OC que entrega 'query'
+COLUMNS = ['Número de documento', 'Número de artículo', 'Fecha de entrega de la línea', 'Cantidad', 'Comentarios']
+
+_SIN_FILAS = np.array([], dtype=np.intp)
+
+
+def _ngrams(texto, n=NGRAM):
+    return {texto[i:i + n] for i in range(len(texto) - n + 1)}
+
+
+def _all_ngrams(texto):
+    """n-gramas de largo 1..NGRAM."""
+    return set().union(*(_ngrams(texto, n) for n in range(1, NGRAM + 1)))
+
+
+class ArrivalsIndex:
+    """
+    Líneas de OC con cantidad y fecha de entrega, ordenadas por fecha, con:
+    - índice por SKU (posiciones, en orden de fecha)
+    - índice de n-gramas sobre el N° de documento (búsqueda parcial)
+
+    Se construye una vez por versión de datos. Como las líneas quedan
+    ordenadas por fecha, "desde hoy" es un corte (searchsorted) y sirve
+    para cualquier día.
+
+    Uso:
+        indice = ArrivalsIndex(df_oc)
+        df = indice.query(sku='EXI-009231', desde=hoy, documento='4500')
+    """
+
+    def __init__(self, df_oc):
+        columnas = [c for c in COLUMNS if c in df_oc.columns]
+        fechas = df_oc['Fecha de entrega de la línea']
+        validas = (df_oc['Cantidad'] > 0) & fechas.notna()
+        # Orden estable: dentro de una fecha se mantiene el orden de la OC
+        self._lineas = df_oc.loc[validas, columnas].sort_values(
+            'Fecha de entrega de la línea', kind='stable'
+        )
+        self._fechas = self._lineas['Fecha de entrega de la línea'].to_numpy()
+
+        # --- 1. Índice por SKU ---
+        self._por_sku = {
+            str(sku): posiciones
+            for sku, posiciones in self._lineas.groupby('Número de artículo', observed=True, sort=False).indices.items()
+        }
+
+        # --- 2. Índice de N° de documento (n-grama -> documentos) ---
+        # Código de documento de cada línea (-1 = sin documento)
+        self._codigo_documento, documentos = pd.factorize(self._lineas['Número de documento'])
+        self._documentos = pd.Series(documentos.astype(str)).str.lower()
+
+        por_ngrama = {}
+        for codigo, texto in enumerate(self._documentos):
+            for ngrama in _all_ngrams(texto):
+                por_ngrama.setdefault(ngrama, []).append(codigo)
+        self._por_ngrama = {ngrama: np.array(lista, dtype=np.intp) for ngrama, lista in por_ngrama.items()}
+
+    def __len__(self):
+        return len(self._lineas)
+
+    def _documentos_con(self, texto):
+        """Códigos de los documentos que contienen 'texto' (sin distinguir mayúsculas)."""
+        texto = texto.lower()
+        if len(texto) <= NGRAM:
+            return self._por_ngrama.get(texto, _SIN_FILAS)
+
+        candidatos = None
+        for ngrama in _ngrams(texto):
+            lista = self._por_ngrama.get(ngrama, _SIN_FILAS)
+            candidatos = lista if candidatos is None else np.intersect1d(candidatos, lista, assume_unique=True)
+            if not len(candidatos):
+                return _SIN_FILAS
+        # Los n-gramas dan candidatos; se confirma la subcadena completa
+        coincide = self._documentos.iloc[candidatos].str.contains(texto, regex=False).to_numpy()
+        return candidatos[coincide]
+
+    def query(self, sku=None, desde=None, hasta=None, documento=None):
+        """
+        Líneas (columnas 'COLUMNS') ordenadas por fecha de entrega.
+
+        - sku: SKU exacto (None = todos)
+        - desde / hasta: fechas de entrega, ambas incluidas (None = sin límite)
+        - documento: texto contenido en el N° de documento, sin distinguir
+          mayúsculas (None o '' = todos)
+        """
+        inicio = 0 if desde is None else np.searchsorted(self._fechas, np.datetime64(pd.Timestamp(desde)), side='left')
+        fin = len(self._fechas) if hasta is None else np.searchsorted(self._fechas, np.datetime64(pd.Timestamp(hasta)), side='right')
+
+        if sku is None and not documento:
+            return self._lineas.iloc[inicio:fin]
+
+        if sku is None:
+            posiciones = np.arange(inicio, fin)
+        else:
+            # Posiciones ascendentes = orden de fecha: el rango es un corte
+            posiciones = self._por_sku.get(str(sku), _SIN_FILAS)
+            posiciones = posiciones[np.searchsorted(posiciones, inicio):np.searchsorted(posiciones, fin)]
+
+        if documento:
+            coincide = np.zeros(len(self._documentos) + 1, dtype=bool) # Último = sin documento (-1)
+            coincide[self._documentos_con(documento)] = True
+            posiciones = posiciones[coincide[self._codigo_documento[posiciones]]]
+
+        return self._lineas.iloc[posiciones]
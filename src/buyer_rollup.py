@@ -0,0 +1,158 @@
+# --- ARCHIVO: src/buyer_rollup.py ---
+# (NUEVO ARCHIVO: KPIs de compradores pre-agregados por (Creador x día))
+#
+# Se construye una vez por versión de datos. Los filtros de la página
+# (compradores y rango de fechas) se resuelven sobre el cubo diario, sin
+# volver a recorrer las líneas de OC.
+
+import numpy as np
+import pandas as pd
+import config
+import distinct_sketch # Sketches HyperLogLog (OCs únicas aproximadas)
+
+
+# --- 1. Construcción ---
+def build_buyer_rollup(df_oc, p=None):
+    """
+    Agrega las líneas de OC por (Creador, día de contabilización).
+
+    - p: precisión de los sketches (por defecto 'config.HLL_PRECISION')
+
+    Retorna un diccionario con:
+    - 'diario': DataFrame (Creador, Dia, Total_Linea, Lineas), ordenado por Dia
+    - 'sketches': np.ndarray uint8 (una fila por fila de 'diario') con el
+      sketch HyperLogLog de los documentos de esa celda
+    - 'documentos': DataFrame (Creador, Dia, doc) con los pares únicos
+      (Creador, día, documento), 'doc' como código entero; ordenado por Dia.
+      Es la fuente del conteo exacto (auditorías).
+    - 'compradores': compradores de las OC (opciones del filtro)
+    - 'fecha_min' / 'fecha_max': primer y último día con datos
+
+    Las líneas sin Creador o sin fecha quedan fuera (igual que en el filtro
+    de la página).
+    """
+    if p is None:
+        p = config.HLL_PRECISION
+
+    dias = df_oc['Fecha de contabilización'].dt.normalize()
+    validas = df_oc['Creador'].notna() & dias.notna()
+    lineas = pd.DataFrame({
+        'Creador': df_oc['Creador'], # Mantiene el tipo categórico
+        'Dia': dias,
+        'Total_Linea': df_oc['Total_Linea'],
+        'Documento': df_oc['Número de documento'],
+    })[validas].reset_index(drop=True)
+
+    # Celdas (Creador, Dia): el código de celda es la posición en 'diario' antes de ordenar
+    celdas = lineas.groupby(['Creador', 'Dia'], observed=True, sort=False)
+    diario = celdas.agg(
+        Total_Linea=('Total_Linea', 'sum'),
+        Lineas=('Total_Linea', 'size'),
+    ).reset_index().sort_values('Dia', kind='stable')
+    orden = diario.index.to_numpy()
+    diario = diario.reset_index(drop=True)
+
+    con_documento = lineas['Documento'].notna()
+    documentos_validos = lineas.loc[con_documento, 'Documento']
+    codigo_celda = celdas.ngroup().to_numpy()[con_documento.to_numpy()]
+    sketches = distinct_sketch.build_sketches(
+        codigo_celda, distinct_sketch.hash_values(documentos_validos), len(diario), p
+    )[orden]
+
+    codigos, _ = pd.factorize(documentos_validos)
+    documentos = lineas.loc[con_documento, ['Creador', 'Dia']].assign(doc=codigos).drop_duplicates()
+    documentos = documentos.sort_values('Dia', kind='stable', ignore_index=True)
+
+    return {
+        'diario': diario,
+        'sketches': sketches,
+        'documentos': documentos,
+        'compradores': df_oc['Creador'].unique(), # En el orden de las OC
+        'fecha_min': diario['Dia'].min() if not diario.empty else pd.NaT,
+        'fecha_max': diario['Dia'].max() if not diario.empty else pd.NaT,
+    }
+
+
+# --- 2. Consultas ---
+# 'exacto': True cuenta OCs únicas sobre los documentos (exacto), False
+# combina los sketches (aproximado, ~3% con p=10). None = 'config.BUYER_KPI_EXACT_COUNTS'.
+def _filtrar(tabla, compradores, inicio, fin):
+    """Filas de 'tabla' (ordenada por Dia) con Dia en [inicio, fin] y Creador en 'compradores'."""
+    dias = tabla['Dia'].to_numpy()
+    desde = np.searchsorted(dias, np.datetime64(pd.Timestamp(inicio).normalize()), side='left')
+    hasta = np.searchsorted(dias, np.datetime64(pd.Timestamp(fin).normalize()), side='right')
+    tramo = tabla.iloc[desde:hasta]
+    return tramo[tramo['Creador'].isin(compradores)]
+
+
+def _año_mes(dias):
+    return dias.dt.to_period('M').astype(str)
+
+
+def _es_exacto(exacto):
+    return config.BUYER_KPI_EXACT_COUNTS if exacto is None else exacto
+
+
+def _ocs_unicas(rollup, diario, claves, exacto, compradores, inicio, fin):
+    """
+    OCs únicas por grupo de 'claves' (función que recibe una tabla filtrada
+    y retorna las columnas de agrupación). Retorna una Serie indexada por grupo.
+    """
+    if _es_exacto(exacto):
+        documentos = _filtrar(rollup['documentos'], compradores, inicio, fin)
+        return documentos.groupby(claves(documentos), observed=True)['doc'].nunique()
+
+    grupos = diario.groupby(claves(diario), observed=True)
+    combinados = distinct_sketch.merge_groups(
+        rollup['sketches'][diario.index.to_numpy()], grupos.ngroup().to_numpy(), grupos.ngroups
+    )
+    return pd.Series(distinct_sketch.estimate(combinados), index=grupos.size().index)
+
+
+def buyer_totals(rollup, compradores, inicio, fin, exacto=None):
+    """
+    KPIs globales del filtro: {'lineas', 'monto_total', 'ocs_unicas', 'compradores_activos'}.
+    """
+    diario = _filtrar(rollup['diario'], compradores, inicio, fin)
+    if _es_exacto(exacto):
+        ocs_unicas = _filtrar(rollup['documentos'], compradores, inicio, fin)['doc'].nunique()
+    else:
+        combinado = rollup['sketches'][diario.index.to_numpy()].max(axis=0, initial=0)
+        ocs_unicas = int(distinct_sketch.estimate(combinado))
+    return {
+        'lineas': int(diario['Lineas'].sum()),
+        'monto_total': diario['Total_Linea'].sum(),
+        'ocs_unicas': ocs_unicas,
+        'compradores_activos': diario['Creador'].nunique(),
+    }
+
+
+def buyer_monthly(rollup, compradores, inicio, fin, exacto=None):
+    """
+    Por (Año-Mes, Creador): monto ('Total_Linea') y OCs únicas ('Conteo_OCs').
+    """
+    diario = _filtrar(rollup['diario'], compradores, inicio, fin)
+    claves = lambda tabla: [_año_mes(tabla['Dia']), tabla['Creador']]
+
+    monto = diario.groupby(claves(diario), observed=True)['Total_Linea'].sum()
+    ocs = _ocs_unicas(rollup, diario, claves, exacto, compradores, inicio, fin)
+    ocs = ocs.reindex(monto.index, fill_value=0)
+
+    df_mensual = pd.DataFrame({'Total_Linea': monto, 'Conteo_OCs': ocs})
+    df_mensual.index.names = ['Año-Mes', 'Creador']
+    return df_mensual.reset_index()
+
+
+def buyer_summary(rollup, compradores, inicio, fin, exacto=None):
+    """
+    Por Creador: 'Monto_Total' y 'OCs_Unicas', ordenado por OCs únicas (desc).
+    """
+    diario = _filtrar(rollup['diario'], compradores, inicio, fin)
+    claves = lambda tabla: tabla['Creador']
+
+    monto = diario.groupby(claves(diario), observed=True)['Total_Linea'].sum()
+    ocs = _ocs_unicas(rollup, diario, claves, exacto, compradores, inicio, fin)
+    ocs = ocs.reindex(monto.index, fill_value=0)
+
+    df_resumen = pd.DataFrame({'Monto_Total': monto, 'OCs_Unicas': ocs}).reset_index()
+    return df_resumen.sort_values(by='OCs_Unicas', ascending=False)
@@ -0,0 +1,144 @@
+# --- ARCHIVO: src/chart_data.py ---
+# (NUEVO ARCHIVO: datos reducidos para los gráficos de simulación)
+#
+# Altair envía cada fila al navegador: con horizontes largos o bandas Monte
+# Carlo el tamaño del gráfico, no el cálculo, es lo que pesa. Aquí se deja
+# solo lo que cambia el dibujo.
+
+import numpy as np
+import pandas as pd
+import config
+
+
+# --- 1. Reducción de series ---
+def slope_change_rows(df, columnas):
+    """
+    Posiciones de las filas donde cambia la pendiente de alguna de
+    'columnas' (segunda diferencia distinta de cero), más la primera y la
+    última. Para series diarias (x equiespaciado) dibujadas con
+    interpolación lineal, el dibujo queda idéntico al de la serie completa.
+    """
+    n = len(df)
+    if n <= 2:
+        return np.arange(n)
+    valores = df[columnas].to_numpy(dtype=np.float64)
+    segunda = valores[2:] - 2 * valores[1:-1] + valores[:-2]
+    # Tolerancia relativa: el consumo diario restado acumula error de redondeo
+    tolerancia = 1e-9 * max(float(np.nanmax(np.abs(valores))), 1.0)
+    cambia = np.empty(n, dtype=bool)
+    cambia[0] = cambia[-1] = True
+    cambia[1:-1] = (np.abs(segunda) > tolerancia).any(axis=1)
+    return np.flatnonzero(cambia)
+
+
+def zero_crossing_rows(df, columnas):
+    """Posiciones de los días en que alguna de 'columnas' pasa a <= 0 o vuelve a ser positiva."""
+    positivos = df[columnas].to_numpy(dtype=np.float64) > 0
+    return np.flatnonzero((positivos[1:] != positivos[:-1]).any(axis=1)) + 1
+
+
+def lttb(x, y, max_puntos):
+    """
+    Largest-Triangle-Three-Buckets: elige 'max_puntos' posiciones de la
+    serie (x, y) que conservan su forma visual (picos y valles). Siempre
+    incluye el primer y el último punto.
+    """
+    n = len(x)
+    if max_puntos >= n or max_puntos < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # max_puntos - 2 tramos entre el segundo y el penúltimo punto
+    bordes = np.linspace(1, n - 1, max_puntos - 1).astype(np.intp)
+    elegidos = np.empty(max_puntos, dtype=np.intp)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(max_puntos - 2):
+        desde, hasta = bordes[i], bordes[i + 1]
+        # Promedio del tramo siguiente (el último punto, para el último tramo)
+        if i + 2 < len(bordes):
+            cx, cy = x[hasta:bordes[i + 2]].mean(), y[hasta:bordes[i + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs(
+            (x[anterior] - cx) * (y[desde:hasta] - y[anterior])
+            - (x[anterior] - x[desde:hasta]) * (cy - y[anterior])
+        )
+        anterior = desde + int(np.argmax(area))
+        elegidos[i + 1] = anterior
+    return elegidos
+
+
+def downsample(df, x_col, y_cols, max_puntos=None, forzadas=None):
+    """
+    Filas de 'df' (una por día, ordenado por 'x_col') reducidas a un
+    presupuesto de puntos, para dibujar con interpolación lineal: primero
+    solo los cambios de pendiente de 'y_cols' y, si aún sobran, LTTB sobre
+    cada columna (presupuesto repartido) uniendo las posiciones elegidas.
+    Los cruces por cero y las posiciones 'forzadas' se conservan siempre.
+
+    - max_puntos: por defecto 'config.CHART_MAX_POINTS' (None en config = sin límite)
+    - forzadas: posiciones (de 'df') que deben quedar, p. ej. días con llegadas
+    """
+    if max_puntos is None:
+        max_puntos = config.CHART_MAX_POINTS
+    obligatorias = zero_crossing_rows(df, y_cols)
+    if forzadas is not None:
+        obligatorias = np.union1d(obligatorias, forzadas)
+    posiciones = np.union1d(slope_change_rows(df, y_cols), obligatorias)
+    if max_puntos is None or len(posiciones) <= max_puntos:
+        return df.iloc[posiciones]
+
+    reducido = df.iloc[posiciones]
+    x = reducido[x_col]
+    x = x.to_numpy(dtype='datetime64[ns]').astype(np.int64) if pd.api.types.is_datetime64_any_dtype(x) else x.to_numpy()
+    por_columna = max(max_puntos // len(y_cols), 3)
+    elegidos = np.concatenate([lttb(x, reducido[col].to_numpy(), por_columna) for col in y_cols])
+    return df.iloc[np.union1d(posiciones[elegidos], obligatorias)]
+
+
+# --- 2. Datos de los gráficos ---
+def build_inventory_chart_data(df_sim, metrics, llegadas_map, max_puntos=None):
+    """
+    Datos del gráfico de proyección ('ui_helpers.generate_simulation_plot').
+
+    Retorna un diccionario con:
+    - 'inventario': (Fecha, Leyenda, Valor) solo con los cambios de
+      pendiente, los cruces por cero y los días con llegadas (y reducido a
+      'max_puntos' si hace falta), para dibujar con interpolación lineal
+    - 'referencias': (Leyenda, Valor) con ROP y SafetyStock, para dibujar
+      como reglas horizontales en vez de una constante por día
+    - 'llegadas': (Fecha, CantidadLlegada, NivelInventario, Leyenda)
+    """
+    df_plot = df_sim.reset_index()[['Fecha', 'NivelInventario']]
+
+    dias_llegada = np.flatnonzero(df_plot['Fecha'].isin(list(llegadas_map)).to_numpy())
+    df_inventario = downsample(df_plot, 'Fecha', ['NivelInventario'], max_puntos, forzadas=dias_llegada)
+    df_inventario = df_inventario.rename(columns={'NivelInventario': 'Valor'}).assign(Leyenda='NivelInventario')
+
+    df_referencias = pd.DataFrame({
+        'Leyenda': ['ROP', 'SafetyStock'],
+        'Valor': [metrics['reorder_point'], metrics['safety_stock']]
+    })
+
+    # Las llegadas se cruzan con la serie completa (su nivel exacto de ese día)
+    df_llegadas = pd.DataFrame(list(llegadas_map.items()), columns=['Fecha', 'CantidadLlegada'])
+    df_llegadas = pd.merge(df_llegadas, df_plot, on='Fecha', how='left')
+    df_llegadas['Leyenda'] = 'Llegada de OC'
+
+    return {
+        'inventario': df_inventario[['Fecha', 'Leyenda', 'Valor']],
+        'referencias': df_referencias,
+        'llegadas': df_llegadas,
+    }
+
+
+def build_band_chart_data(df_bandas, max_puntos=None):
+    """
+    Filas de 'df_bandas' (Monte Carlo) a dibujar: los cambios de pendiente
+    de P5, P50, P95 o ProbQuiebre, reducidos a 'max_puntos' si hace falta.
+    """
+    df_plot = df_bandas.reset_index()
+    columnas = [c for c in ['P5', 'P50', 'P95', 'ProbQuiebre'] if c in df_plot.columns]
+    return downsample(df_plot, 'Fecha', columnas, max_puntos)
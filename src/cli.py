@@ -0,0 +1,133 @@
+# --- ARCHIVO: src/cli.py ---
+# (NUEVO ARCHIVO: ejecución sin Streamlit del radar y la simulación por lotes, p. ej. desde cron)
+#
+# Uso (desde la raíz del repo):
+#   python -m src.cli radar --salida reportes/radar.parquet
+#   python -m src.cli radar --bodega-stock BF0001 --bodega-consumo "Bodega de Proyectos RE" --salida radar.csv
+#   python -m src.cli simulacion --bodega-stock BF0001 --bodega-consumo "Bodega de Proyectos RE" --salida sim.parquet
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+for ruta in (str(RAIZ), str(RAIZ / 'src')):
+    if ruta not in sys.path:
+        sys.path.append(ruta)
+
+import config
+import data_pipeline
+import simulator
+import radar_engine
+import parallel_radar
+
+
+# --- 1. Escritura de Resultados ---
+def write_output(df, ruta):
+    """Escribe 'df' como Parquet o CSV según la extensión de 'ruta'."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    if ruta.suffix.lower() == '.parquet':
+        df.to_parquet(ruta, index=False)
+    elif ruta.suffix.lower() == '.csv':
+        df.to_csv(ruta, index=False, encoding='utf-8')
+    else:
+        raise ValueError(f"Formato no soportado: '{ruta.suffix}' (use .parquet o .csv)")
+    print(f"Escrito '{ruta}' ({len(df)} filas).")
+
+
+# --- 2. Comandos ---
+def run_radar(args, datos):
+    """Radar de un par de bodegas, o de todas las combinaciones si no se indican."""
+    df_stock, df_oc, df_consumo, _, _, demand_cube = datos
+    z = config.Z_SCORE_MAP[args.nivel_servicio]
+
+    if args.bodega_stock and args.bodega_consumo:
+        df_radar = radar_engine.compute_radar_kpis(
+            df_stock, df_consumo, df_oc,
+            args.bodega_stock, args.bodega_consumo,
+            args.lead_time, z, demand_cube=demand_cube
+        )
+    elif args.procesos != 1:
+        df_radar = parallel_radar.compute_radar_matrix_parallel(
+            df_stock, df_consumo, df_oc, args.lead_time, z, n_workers=args.procesos
+        ).reset_index()
+    else:
+        df_radar = radar_engine.compute_radar_matrix(
+            df_stock, df_consumo, df_oc, args.lead_time, z, demand_cube=demand_cube
+        ).reset_index()
+
+    write_output(df_radar, args.salida)
+
+
+def run_simulation(args, datos):
+    """
+    Simulación por lotes: escribe las trayectorias (SKU x fecha) en 'salida'
+    y las métricas por SKU en '<salida>_metricas'.
+    """
+    df_stock, df_oc, df_consumo, _, _, demand_cube = datos
+    skus = 'all' if args.skus == ['all'] else args.skus
+
+    df_matriz, df_metricas = simulator.run_portfolio_simulation(
+        skus, args.bodega_stock, args.bodega_consumo,
+        df_stock, df_consumo, df_oc,
+        args.dias, args.lead_time, config.Z_SCORE_MAP[args.nivel_servicio],
+        demand_cube=demand_cube
+    )
+
+    df_matriz.columns = df_matriz.columns.strftime('%Y-%m-%d')
+    write_output(df_matriz.reset_index(), args.salida)
+    write_output(df_metricas.reset_index(), args.salida.with_name(f"{args.salida.stem}_metricas{args.salida.suffix}"))
+
+
+# --- 3. Línea de Comandos ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Radar y simulación de inventario sin Streamlit.")
+    parser.add_argument('--directorio', type=Path, default=RAIZ, help="Carpeta que contiene 'data/' (por defecto, la raíz del repo)")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    def parametros_comunes(sub):
+        sub.add_argument('--salida', type=Path, required=True, help="Archivo de salida (.parquet o .csv)")
+        sub.add_argument('--lead-time', type=int, default=90, help="Lead time en días")
+        sub.add_argument('--nivel-servicio', choices=list(config.Z_SCORE_MAP), default='99%')
+
+    radar = comandos.add_parser('radar', help="KPIs del radar (un par de bodegas o todas)")
+    radar.add_argument('--bodega-stock')
+    radar.add_argument('--bodega-consumo')
+    radar.add_argument('--procesos', type=int, default=config.RADAR_WORKERS,
+                       help="Procesos para el radar de todas las bodegas (0 = todos los núcleos)")
+    parametros_comunes(radar)
+
+    simulacion = comandos.add_parser('simulacion', help="Simulación por lotes de una bodega")
+    simulacion.add_argument('--bodega-stock', required=True)
+    simulacion.add_argument('--bodega-consumo', required=True)
+    simulacion.add_argument('--skus', nargs='+', default=['all'], help="SKUs a simular, o 'all'")
+    simulacion.add_argument('--dias', type=int, default=100, help="Días a simular")
+    parametros_comunes(simulacion)
+
+    args = parser.parse_args(argv)
+    if getattr(args, 'procesos', 1) == 0:
+        args.procesos = None
+    if args.comando == 'simulacion' and args.dias < 0:
+        parser.error("--dias no puede ser negativo.")
+    if args.comando == 'radar' and bool(args.bodega_stock) != bool(args.bodega_consumo):
+        parser.error("Indique ambas bodegas (stock y consumo) o ninguna.")
+
+    # La salida se resuelve antes de cambiar a la carpeta de datos
+    args.salida = args.salida.resolve()
+    try:
+        os.chdir(args.directorio)
+        datos = data_pipeline.load_all_data()
+    except FileNotFoundError as e:
+        print(f"Error: No se pudo encontrar el archivo: {e.filename} en la carpeta 'data/'.", file=sys.stderr)
+        return 2
+
+    if args.comando == 'radar':
+        run_radar(args, datos)
+    else:
+        run_simulation(args, datos)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,73 @@ AVERAGE_DAYS_PER_MONTH = 30.4375
 LOCALE_ES = 'es_ES.UTF-8' # Para nombres de meses en español
 LOCALE_ES_FALLBACK = 'Spanish_Spain.1252'
 
+# --- Rutas de Datos ---
+DATA_DIR = 'data'
+CACHE_DIR = 'data/.cache' # Copias columnares (Parquet) de los Excel de 'data/'
+
+# --- Columnas que Usa la App (por Archivo) ---
+# Solo estas columnas se leen de la copia columnar de cada Excel (None = todas).
+# BD_Master_Residencial no se lee al cargar: es una tabla bajo demanda ('lazy_table.py').
+SOURCE_COLUMNS = {
+    'stock': ['CodigoArticulo', 'NombreArticulo', 'CodigoBodega', 'DisponibleParaPrometer'],
+    'oc': [
+        'Número de documento', 'Fecha de contabilización', 'Número de artículo', 'Cantidad',
+        'Fecha de entrega de la línea', 'Creador', 'Total_Linea', 'Comentarios',
+    ],
+    'consumo': ['DocNum', 'CodigoArticulo', 'BodegaDestino_Requerida', 'FechaSolicitud', 'CantidadSolicitada'],
+}
+
+# --- Ingesta Incremental (Consumo y OC) ---
+# Si está activa, ST_OWTR y OPOR se leen desde un almacén local (Parquet) que
+# solo agrega o actualiza las líneas de los archivos delta de INCREMENTAL_DIR.
+INCREMENTAL_MODE = False
+INCREMENTAL_DIR = 'data/incremental' # Deltas diarios: ST_OWTR_*.xlsx, OPOR_*.xlsx
+STORE_DIR = 'data/.cache/store'
+INCREMENTAL_TABLES = {
+    'consumo': {
+        'base': 'data/ST_OWTR.xlsx',       # Export completo (carga inicial)
+        'patron_delta': 'ST_OWTR_*.xlsx',
+        'col_fecha': 'FechaSolicitud',
+        # Grupo de líneas que un delta reemplaza completo (agregar 'LineNum' si el export la trae)
+        'cols_linea': ['DocNum', 'CodigoArticulo', 'BodegaDestino_Requerida'],
+    },
+    'oc': {
+        'base': 'data/OPOR.xlsx',
+        'patron_delta': 'OPOR_*.xlsx',
+        'col_fecha': 'Fecha de contabilización',
+        'cols_linea': ['Número de documento', 'Número de artículo'],
+    },
+}
+# Lock del almacén (CLI y refresco en segundo plano): segundos de espera, y
+# antigüedad desde la que un lock se considera abandonado
+STORE_LOCK_TIMEOUT_S = 120
+STORE_LOCK_STALE_S = 1800
+
+# --- Refresco de Datos en Segundo Plano ---
+# Un hilo revisa cada DATA_REFRESH_INTERVAL_S segundos si cambiaron los archivos
+# de 'data/' (fecha de modificación y tamaño) y, si cambiaron, prepara la versión
+# nueva de los datos sin bloquear a los usuarios (ver 'data_store.py').
+DATA_REFRESH_ENABLED = True
+DATA_REFRESH_INTERVAL_S = 60
+DATA_REFRESH_MAX_AGE_S = None # Recarga programada aunque no haya cambios (None = solo ante cambios)
+
+# --- Caché de Simulaciones (Simulador) ---
+# Resultados por (SKU, bodegas, días, lead time, z, versión de datos, fecha)
+SIM_CACHE_MAX_ENTRIES = 256
+SIM_CACHE_TTL_S = 3600
+
+# --- KPIs de Compradores (conteo de OCs únicas) ---
+# Precisión de los sketches HyperLogLog por (comprador, día): 2**p registros,
+# error típico ~1.04/sqrt(2**p) (p=10 -> ~3%).
+HLL_PRECISION = 10
+# True = conteo exacto por defecto (auditorías); la página permite cambiarlo.
+BUYER_KPI_EXACT_COUNTS = False
+
+# --- Ejecución en Paralelo (CLI) ---
+# Procesos para el radar multi-bodega de 'cli.py' (1 = un solo proceso, None = todos los núcleos).
+# Las páginas usan siempre un solo proceso: 'spawn' re-ejecutaría el script de la página en cada proceso.
+RADAR_WORKERS = 1
+
 # --- Parámetros de Simulación ---
 Z_SCORE_MAP = {
     "90%": 1.28, 
@@ -16,7 +83,20 @@ Z_SCORE_MAP = {
     "99%": 2.33
 }
 
+# --- Gráficos de Simulación ---
+# Máximo de puntos por serie que se envían al navegador (ver 'chart_data.py').
+# Las series primero se reducen a sus cambios de pendiente; si aún superan este
+# límite se submuestrean con LTTB. None = sin límite.
+CHART_MAX_POINTS = 1000
+
 # --- Mapeo de SKUs (Homogenización) ---
+# Las cadenas (A -> B -> C) se resuelven al SKU final (ver 'sku_canonical.py').
+# Tablas a las que se aplica el mapeo:
+SKU_CANONICAL_TABLES = {
+    'consumo': True,
+    'stock': False,
+    'oc': False,
+}
 MAPEO_SKUS = {
     # Grupo 1 (SKUs -> EXI-009231) Inversores 1P5kw Hibrido
     'EXI-008656': 'EXI-009231',
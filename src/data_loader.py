@@ -1,85 +1,63 @@
 # --- ARCHIVO: src/data_loader.py ---
 # (Modificado para usar rutas de 'data/' y 'st.session_state')
+# (Los datos viven en un almacén compartido por todas las sesiones, ver 'data_store.py')
 
-import pandas as pd
 import streamlit as st
 import config # Importamos nuestro archivo de configuración local
+import data_store # Almacén de datos compartido (sin Streamlit)
 
-# --- 1. Función de Carga Real (Cacheada) ---
-@st.cache_data
-def _load_all_data():
+# --- 1. Almacén Compartido (uno por proceso) ---
+@st.cache_resource
+def get_data_store():
     """
-    Carga, limpia y pre-procesa todos los archivos de datos iniciales.
-    Usa la carpeta 'data/'.
-    
-    Retorna:
-    - tupla(pd.DataFrame): (df_stock, df_oc, df_consumo, df_residencial)
-    
-    Lanza:
-    - FileNotFoundError: Si no se encuentra un archivo Excel esencial.
+    Almacén de datos compartido por todas las sesiones (ver 'data_store.py').
+    'st.cache_resource' entrega el mismo objeto a todos (sin copiarlo), así
+    la memoria no crece con el número de usuarios conectados. Con
+    'config.DATA_REFRESH_ENABLED', un hilo publica versiones nuevas cuando
+    cambian los archivos de 'data/'.
     """
-    print("--- (EJECUTANDO CACHE) Cargando y Limpiando Datos Globales ---")
-    
+    print("--- Creando almacén de datos compartido ---")
+    store = data_store.DataStore()
+    if config.DATA_REFRESH_ENABLED:
+        store.start_refresher(config.DATA_REFRESH_INTERVAL_S, max_age_s=config.DATA_REFRESH_MAX_AGE_S)
+    return store
+
+# --- 2. Función de Acceso a Session State ---
+def _bind_snapshot(snapshot):
+    """Guarda en st.session_state las vistas (copy-on-write) de la foto 'snapshot'."""
+    for nombre, vista in snapshot.views().items():
+        st.session_state[nombre] = vista
+    st.session_state.data_version = snapshot.version
+    st.session_state.data_loaded_at = snapshot.cargado_en
+    st.session_state.data_loaded = True
+
+def load_data_into_session():
+    """
+    Guarda en st.session_state las tablas del almacén compartido para que
+    todas las páginas las usen. Son referencias a los mismos datos (no
+    copias); si el almacén publicó una versión nueva, se actualizan.
+    Cada página la llama al inicio: si la versión no cambió, no hace nada.
+    """
+    if st.session_state.get('data_version') == get_data_store().version:
+        return
     try:
-        # RUTAS ACTUALIZADAS A LA CARPETA 'data/'
-        df_stock = pd.read_excel('data/Stock.xlsx')
-        df_residencial = pd.read_excel("data/BD_Master_Residencial.xlsx")
-        df_oc = pd.read_excel("data/OPOR.xlsx")
-        df_consumo = pd.read_excel('data/ST_OWTR.xlsx')
-        print("Archivos 'Stock', 'OPOR' y 'ST_OWTR' cargados desde 'data/'.")
-    
+        snapshot = get_data_store().snapshot()
+        _bind_snapshot(snapshot)
+        print(f"Datos (versión {snapshot.version}) enlazados en st.session_state.")
+
     except FileNotFoundError as e:
         print(f"Error: No se pudo encontrar el archivo: {e.filename} en la carpeta 'data/'.")
-        raise e # Esto detendrá la carga
+        st.error(f"Error Crítico: No se pudo encontrar el archivo: {e.filename}.")
+        st.info(f"Por favor, asegúrese de que el archivo '{e.filename}' esté en la carpeta 'data/'.")
+        st.stop()
     except Exception as e:
-        st.error(f"Error inesperado al leer archivos: {e}")
-        return None, None, None, None
+        st.error(f"Ocurrió un error inesperado durante la carga de datos: {e}")
+        st.stop()
 
-    # --- Limpieza Global de Fechas ---
-    df_oc['Fecha de contabilización'] = pd.to_datetime(df_oc['Fecha de contabilización'], format='%Y-m-%d', errors='coerce')
-    df_consumo['FechaSolicitud'] = pd.to_datetime(df_consumo['FechaSolicitud'], errors='coerce')
-    
-    df_oc = df_oc.dropna(subset=['Fecha de contabilización'])
-    df_consumo = df_consumo.dropna(subset=['FechaSolicitud'])
-
-    # --- Filtro Global de 4 Meses ---
-    hoy = pd.Timestamp.now()
-    hace_4_meses = (hoy - pd.DateOffset(months=4)).replace(day=1) 
-    
-    df_oc = df_oc[df_oc['Fecha de contabilización'] >= hace_4_meses].copy()
-    df_oc = df_oc[~df_oc['Comentarios'].str.contains('PROA', na=False)].copy()    
-    df_consumo = df_consumo[df_consumo['FechaSolicitud'] >= hace_4_meses].copy()
-
-    # --- Limpieza Global de SKUs (Usando config) ---
-    df_consumo['CodigoArticulo'] = df_consumo['CodigoArticulo'].replace(config.MAPEO_SKUS)
-    # df_oc['Número de artículo'] = df_oc['Número de artículo'].replace(config.MAPEO_SKUS)
-    # df_stock['CodigoArticulo'] = df_stock['CodigoArticulo'].replace(config.MAPEO_SKUS)
-    
-    print("Datos globales cargados y limpiados.")
-    
-    return df_stock, df_oc, df_consumo, df_residencial
-
-# --- 2. Función de Acceso a Session State ---
-def load_data_into_session():
+def reload_data():
     """
-    Wrapper que llama a la función cacheada y guarda los datos
-    en st.session_state para que todas las páginas los usen.
+    Vuelve a leer los archivos de 'data/' y publica una versión nueva en el
+    almacén compartido; esta sesión pasa a usarla de inmediato y las demás
+    en su próxima interacción (ver 'load_data_into_session').
     """
-    if 'data_loaded' not in st.session_state:
-        try:
-            # Llama a la función cacheada
-            (st.session_state.df_stock, 
-             st.session_state.df_oc, 
-             st.session_state.df_consumo, 
-             st.session_state.df_residencial) = _load_all_data()
-            
-            st.session_state.data_loaded = True
-            print("Datos cargados en st.session_state.")
-
-        except FileNotFoundError as e:
-            st.error(f"Error Crítico: No se pudo encontrar el archivo: {e.filename}.")
-            st.info(f"Por favor, asegúrese de que el archivo '{e.filename}' esté en la carpeta 'data/'.")
-            st.stop()
-        except Exception as e:
-            st.error(f"Ocurrió un error inesperado durante la carga de datos: {e}")
-            st.stop()
\ No newline at end of file
+    _bind_snapshot(get_data_store().reload())
@@ -0,0 +1,160 @@
+# --- ARCHIVO: src/data_pipeline.py ---
+# (NUEVO ARCHIVO: carga y limpieza de datos sin Streamlit, usada por la app y la CLI)
+
+import pandas as pd
+from pathlib import Path
+import config # Importamos nuestro archivo de configuración local
+from excel_cache import read_excel_cached # Lectura vía caché columnar
+from lazy_table import LazyTable # Tablas bajo demanda
+import row_index # Índices de filas por (SKU, bodega)
+import incremental_store # Almacén incremental de consumo y OC
+import schema # Tipos compactos (categorías compartidas, numéricos, fechas)
+import sku_canonical # Homogenización de SKUs (mapeo transitivo)
+from demand_cube import build_demand_cube # Demanda mensual precalculada
+
+
+# --- 1. Normalización de Tablas ---
+def prepare_oc_table(df_oc):
+    """
+    Deja la tabla de OC (OPOR) lista para todos los motores y páginas:
+    - 'Fecha de entrega de la línea' como fecha
+    - 'Cantidad' como número
+    - 'Número de documento' como texto (búsqueda parcial de OC)
+    - 'Número de artículo' como categoría
+    Se ejecuta una sola vez al cargar, así nadie más copia ni convierte la tabla.
+    """
+    df_oc['Fecha de entrega de la línea'] = pd.to_datetime(df_oc['Fecha de entrega de la línea'], format='%Y-m-%d', errors='coerce')
+    df_oc['Cantidad'] = pd.to_numeric(df_oc['Cantidad'], errors='coerce')
+
+    # Texto con NA (no NaN ni '<NA>'); la caché Parquet lo entrega como 'Int64' y
+    # el Excel con celdas vacías como float: los enteros se escriben sin '.0'
+    documentos = df_oc['Número de documento']
+    if pd.api.types.is_float_dtype(documentos) and (documentos.dropna() % 1 == 0).all():
+        documentos = documentos.astype('Int64')
+    df_oc['Número de documento'] = documentos.astype('string')
+
+    df_oc['Número de artículo'] = df_oc['Número de artículo'].astype('category')
+    return df_oc
+
+
+def window_start():
+    """Inicio de la ventana global de datos: primer día del mes, hace 4 meses."""
+    hoy = pd.Timestamp.now()
+    return (hoy - pd.DateOffset(months=4)).replace(day=1)
+
+
+# --- 2. Lectura de Archivos ---
+SOURCE_FILES = ['data/Stock.xlsx', 'data/BD_Master_Residencial.xlsx', 'data/OPOR.xlsx', 'data/ST_OWTR.xlsx']
+
+
+def sources_signature():
+    """
+    Firma de los archivos fuente: (ruta, fecha de modificación, tamaño) de
+    cada uno, más los deltas con 'config.INCREMENTAL_MODE'. Cambia si se
+    reemplaza, modifica o agrega un archivo; sirve para saber si hay que recargar.
+    """
+    rutas = [Path(p) for p in SOURCE_FILES]
+    if config.INCREMENTAL_MODE:
+        for spec in config.INCREMENTAL_TABLES.values():
+            rutas += sorted(Path(config.INCREMENTAL_DIR).glob(spec['patron_delta']))
+
+    firma = []
+    for ruta in rutas:
+        try:
+            info = ruta.stat()
+            firma.append((str(ruta), info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            firma.append((str(ruta), None, None))
+    return tuple(firma)
+
+
+def _select_columns(df, nombre):
+    """Deja solo las columnas de 'config.SOURCE_COLUMNS[nombre]' que existan en 'df'."""
+    columnas = config.SOURCE_COLUMNS.get(nombre)
+    if columnas is None:
+        return df
+    return df[[c for c in columnas if c in df.columns]]
+
+
+def read_sources(desde):
+    """
+    Lee los archivos de 'data/' (Stock, OPOR y ST_OWTR), solo con las
+    columnas de 'config.SOURCE_COLUMNS'. Los Excel se leen desde su copia
+    columnar cacheada (ver 'excel_cache.py'), que solo se regenera si el
+    archivo cambió. Con 'config.INCREMENTAL_MODE', consumo y OC salen del
+    almacén incremental (ver 'incremental_store.py'), recortado a 'desde'.
+
+    BD_Master_Residencial no se lee aquí: se entrega como 'LazyTable', que
+    lo lee (y solo las columnas pedidas) la primera vez que una página lo usa.
+
+    Retorna:
+    - tupla: (df_stock, df_oc, df_consumo, df_residencial) sin limpiar;
+      'df_residencial' es un 'LazyTable'
+
+    Lanza:
+    - FileNotFoundError: Si no se encuentra un archivo Excel esencial.
+    """
+    # RUTAS ACTUALIZADAS A LA CARPETA 'data/'
+    df_stock = read_excel_cached('data/Stock.xlsx', columns=config.SOURCE_COLUMNS.get('stock'))
+    df_residencial = LazyTable("data/BD_Master_Residencial.xlsx")
+    if config.INCREMENTAL_MODE:
+        df_oc = _select_columns(incremental_store.sync_table('oc', desde=desde), 'oc')
+        df_consumo = _select_columns(incremental_store.sync_table('consumo', desde=desde), 'consumo')
+    else:
+        df_oc = read_excel_cached("data/OPOR.xlsx", columns=config.SOURCE_COLUMNS.get('oc'))
+        df_consumo = read_excel_cached('data/ST_OWTR.xlsx', columns=config.SOURCE_COLUMNS.get('consumo'))
+    print("Archivos 'Stock', 'OPOR' y 'ST_OWTR' cargados desde 'data/'.")
+    return df_stock, df_oc, df_consumo, df_residencial
+
+
+# --- 3. Limpieza y Estructuras Derivadas ---
+def prepare_tables(df_stock, df_oc, df_consumo, df_residencial, desde):
+    """
+    Limpia las tablas leídas y construye las estructuras compartidas.
+
+    Retorna:
+    - tupla: (df_stock, df_oc, df_consumo, df_residencial, row_indexes, demand_cube)
+      'row_indexes' son los índices de filas por (SKU, bodega) de
+      'row_index.build_table_indexes'; 'demand_cube' es el cubo de demanda
+      (bodega de consumo x SKU x mes) de 'demand_cube.build_demand_cube'.
+    """
+    # --- Limpieza Global de Fechas ---
+    df_oc['Fecha de contabilización'] = pd.to_datetime(df_oc['Fecha de contabilización'], format='%Y-m-%d', errors='coerce')
+    df_consumo['FechaSolicitud'] = pd.to_datetime(df_consumo['FechaSolicitud'], errors='coerce')
+
+    df_oc = df_oc.dropna(subset=['Fecha de contabilización'])
+    df_consumo = df_consumo.dropna(subset=['FechaSolicitud'])
+
+    # --- Filtro Global de 4 Meses ---
+    df_oc = df_oc[df_oc['Fecha de contabilización'] >= desde].copy()
+    df_oc = df_oc[~df_oc['Comentarios'].str.contains('PROA', na=False)].copy()
+    df_consumo = df_consumo[df_consumo['FechaSolicitud'] >= desde].copy()
+
+    # --- Tabla de OC normalizada (compartida por motores y páginas) ---
+    df_oc = prepare_oc_table(df_oc)
+
+    # --- Tipos compactos: SKUs y bodegas como categorías compartidas ---
+    df_stock, df_oc, df_consumo = schema.apply_schema(df_stock, df_oc, df_consumo)
+
+    # --- Limpieza Global de SKUs (Usando config) ---
+    # Mapeo resuelto a su SKU final y aplicado a las tablas de 'config.SKU_CANONICAL_TABLES'
+    df_stock, df_oc, df_consumo = sku_canonical.canonicalize_tables(df_stock, df_oc, df_consumo)
+
+    # --- Índices de filas (filtros por SKU/bodega sin recorrer las tablas) ---
+    row_indexes = row_index.build_table_indexes(df_stock, df_oc, df_consumo)
+
+    # --- Cubo de demanda (estadísticas mensuales por bodega de consumo y SKU) ---
+    demand_cube = build_demand_cube(df_consumo)
+
+    print("Datos globales cargados y limpiados.")
+
+    return df_stock, df_oc, df_consumo, df_residencial, row_indexes, demand_cube
+
+
+def load_all_data():
+    """
+    Carga completa sin Streamlit: lectura + limpieza (ver 'read_sources' y
+    'prepare_tables'). Los errores se propagan al llamador.
+    """
+    desde = window_start()
+    return prepare_tables(*read_sources(desde), desde)
@@ -0,0 +1,160 @@
+# --- ARCHIVO: src/data_store.py ---
+# (NUEVO ARCHIVO: almacén de datos compartido por todas las sesiones, de solo lectura)
+#
+# Las tablas se cargan una vez por proceso y todas las sesiones leen las
+# mismas. Cada sesión recibe "vistas" copy-on-write (copias superficiales):
+# no duplican memoria, y si una página modifica su vista, pandas copia solo
+# lo modificado sin tocar la tabla compartida.
+#
+# Un hilo en segundo plano (ver 'DataStore.start_refresher') prepara la
+# versión siguiente cuando cambian los archivos de 'data/' y la publica
+# reemplazando la referencia: ningún usuario espera la recarga.
+
+import threading
+import pandas as pd
+import data_pipeline # Carga y limpieza (sin Streamlit)
+
+# Copy-on-Write viene activado (y es obligatorio) desde pandas 3.0
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Nombres de las estructuras, en el orden de 'data_pipeline.prepare_tables'
+TABLE_NAMES = ['df_stock', 'df_oc', 'df_consumo', 'df_residencial', 'row_indexes', 'demand_cube']
+
+
+# --- 1. Foto de los Datos (inmutable) ---
+class DataSnapshot:
+    """
+    Una versión cargada de los datos: tablas, índices y cubo de demanda.
+    No se modifica después de creada; una recarga crea una foto nueva.
+    """
+
+    def __init__(self, tablas, version, firma=None):
+        self._tablas = dict(zip(TABLE_NAMES, tablas))
+        self.version = version
+        self.firma = firma # Firma de los archivos fuente al momento de leerlos
+        self.cargado_en = pd.Timestamp.now()
+        _freeze_row_indexes(self._tablas['row_indexes'])
+
+    def view(self, nombre):
+        """
+        Estructura 'nombre' para una sesión. Los DataFrames se entregan como
+        copia superficial (copy-on-write); índices y cubo, tal cual (solo lectura).
+        """
+        valor = self._tablas[nombre]
+        if isinstance(valor, pd.DataFrame):
+            return valor.copy(deep=False)
+        return valor
+
+    def views(self):
+        """Diccionario {nombre: vista} con todas las estructuras (ver 'view')."""
+        return {nombre: self.view(nombre) for nombre in TABLE_NAMES}
+
+
+def _freeze_row_indexes(row_indexes):
+    """Marca como solo lectura las posiciones de los índices de filas (arreglos numpy compartidos)."""
+    for indice in (row_indexes or {}).values():
+        for posiciones in indice.values():
+            posiciones.flags.writeable = False
+
+
+# --- 2. Almacén (uno por proceso) ---
+class DataStore:
+    """
+    Almacén compartido: guarda la foto vigente y la reemplaza en 'reload'.
+
+    - snapshot(): foto vigente (la carga en el primer uso)
+    - reload(): vuelve a leer y limpiar los datos y publica una foto nueva
+      con 'version' + 1. Las sesiones que tienen la foto anterior la siguen
+      usando hasta que piden la nueva.
+    - version: versión de la foto vigente (0 = sin cargar)
+    - refresh_if_changed() / start_refresher(): recarga solo si cambió la
+      firma de los archivos (o la foto es más antigua que 'max_age_s')
+
+    'loader' retorna la tupla de 'data_pipeline.prepare_tables'
+    (por defecto, 'data_pipeline.load_all_data'). Sus errores se propagan y
+    no dejan una foto a medias. 'signature' retorna la firma de los archivos
+    fuente (por defecto, 'data_pipeline.sources_signature').
+    """
+
+    def __init__(self, loader=data_pipeline.load_all_data, signature=data_pipeline.sources_signature):
+        self._loader = loader
+        self._signature = signature
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._refresher = None
+        self._detener = threading.Event()
+
+    @property
+    def version(self):
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else 0
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            # Otra sesión pudo cargarla mientras se esperaba el lock
+            if self._snapshot is None:
+                self._snapshot = self._build(version=1)
+            return self._snapshot
+
+    def reload(self):
+        with self._lock:
+            # Se construye completa antes de publicarla: mientras tanto las
+            # sesiones siguen leyendo la foto anterior
+            nueva = self._build(version=self.version + 1)
+            self._snapshot = nueva # Reemplazo atómico de la referencia
+            return nueva
+
+    def _build(self, version):
+        firma = self._signature() # Antes de leer: un cambio durante la lectura se recarga después
+        return DataSnapshot(self._loader(), version=version, firma=firma)
+
+    # --- 3. Refresco en Segundo Plano ---
+    def refresh_if_changed(self, max_age_s=None):
+        """
+        Recarga si cambiaron los archivos fuente desde la foto vigente, o si
+        la foto tiene más de 'max_age_s' segundos. Sin foto cargada no hace
+        nada (la primera carga ocurre al primer uso).
+
+        Retorna la foto nueva, o None si no hubo recarga.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        vencida = max_age_s is not None and (pd.Timestamp.now() - snapshot.cargado_en).total_seconds() >= max_age_s
+        if not vencida and self._signature() == snapshot.firma:
+            return None
+        return self.reload()
+
+    def start_refresher(self, interval_s, max_age_s=None):
+        """
+        Inicia (una sola vez) el hilo que llama a 'refresh_if_changed' cada
+        'interval_s' segundos. Si una recarga falla, se informa y se mantiene
+        la foto vigente.
+        """
+        if self._refresher is not None and self._refresher.is_alive():
+            return self._refresher
+
+        def revisar():
+            while not self._detener.wait(interval_s):
+                try:
+                    nueva = self.refresh_if_changed(max_age_s)
+                    if nueva is not None:
+                        print(f"Datos recargados en segundo plano (versión {nueva.version}).")
+                except Exception as e:
+                    print(f"Error al recargar datos en segundo plano (se mantiene la versión {self.version}): {e}")
+
+        self._detener.clear()
+        self._refresher = threading.Thread(target=revisar, name='data-refresher', daemon=True)
+        self._refresher.start()
+        return self._refresher
+
+    def stop_refresher(self):
+        """Detiene el hilo de refresco (si está corriendo)."""
+        self._detener.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
@@ -0,0 +1,79 @@
+# --- ARCHIVO: src/demand_cube.py ---
+# (NUEVO ARCHIVO: cubo de demanda mensual Bodega de consumo x SKU x Mes)
+
+import pandas as pd
+import aggregations
+
+# Dimensiones del cubo (sin contar el mes)
+CUBE_KEYS = ['BodegaDestino_Requerida', 'CodigoArticulo']
+
+
+def build_demand_cube(df_consumo, today=None):
+    """
+    Materializa la demanda mensual por (bodega de consumo, SKU, mes) y sus
+    estadísticas (media y std sobre los meses completos).
+
+    Se construye una sola vez al cargar los datos; las estadísticas dependen
+    del mes actual, por eso el cubo guarda el mes para el que fue calculado
+    (ver 'is_cube_current').
+
+    Retorna un diccionario con:
+    - 'mes_referencia': inicio del mes actual al construir el cubo
+    - 'mensual': Serie indexada por (bodega, SKU, 'Mes')
+    - 'stats': DataFrame indexado por (bodega, SKU) con monthly_mean,
+      monthly_std y n_meses
+    """
+    if today is None:
+        today = pd.Timestamp.now().floor('D')
+
+    mensual = aggregations.monthly_demand_by(df_consumo, CUBE_KEYS).sort_index()
+    stats = aggregations.demand_stats_by(df_consumo, CUBE_KEYS, today, mensual=mensual).sort_index()
+    if stats.empty:
+        # Sin consumo: se deja el índice (bodega, SKU) para que las consultas no cambien
+        stats.index = pd.MultiIndex.from_arrays([[], []], names=CUBE_KEYS)
+
+    return {
+        'mes_referencia': today.replace(day=1),
+        'mensual': mensual,
+        'stats': stats,
+    }
+
+
+def is_cube_current(demand_cube, today):
+    """True si el cubo fue calculado para el mes de 'today' (si no, hay que recalcular)."""
+    return demand_cube is not None and demand_cube['mes_referencia'] == today.replace(day=1)
+
+
+def sku_demand(demand_cube, bodega_consumo, sku):
+    """
+    Demanda de un SKU en una bodega de consumo.
+
+    Retorna (stats, mensual):
+    - stats: Serie con monthly_mean, monthly_std y n_meses (None si no hay consumo)
+    - mensual: Serie indexada por 'Mes' (vacía si no hay consumo)
+    """
+    try:
+        stats = demand_cube['stats'].loc[(bodega_consumo, sku)]
+    except KeyError:
+        return None, pd.Series(dtype=float)
+
+    mensual = demand_cube['mensual'].loc[(bodega_consumo, sku)]
+    return stats, mensual
+
+
+def warehouse_stats(demand_cube, bodega_consumo):
+    """Estadísticas de demanda de todos los SKUs de una bodega de consumo (indexadas por SKU)."""
+    stats = demand_cube['stats']
+    try:
+        return stats.xs(bodega_consumo, level=0)
+    except KeyError:
+        return stats.iloc[0:0].droplevel(0)
+
+
+def warehouse_monthly(demand_cube, bodega_consumo):
+    """Demanda mensual de todos los SKUs de una bodega de consumo (indexada por SKU, 'Mes')."""
+    mensual = demand_cube['mensual']
+    try:
+        return mensual.xs(bodega_consumo, level=0)
+    except KeyError:
+        return mensual.iloc[0:0].droplevel(0)
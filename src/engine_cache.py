@@ -0,0 +1,153 @@
+# --- ARCHIVO: src/engine_cache.py ---
+# (NUEVO ARCHIVO: envoltorios cacheados con st.cache_data de los motores, solo para las páginas)
+
+import pandas as pd
+import streamlit as st
+import config
+import radar_engine
+import buyer_rollup
+from arrivals_index import ArrivalsIndex # Índice de llegadas de OC
+from sku_catalog import SkuCatalog # Catálogo de SKUs de los selectores
+import simulator
+from result_cache import ResultCache # Caché LRU/TTL con contadores
+
+
+@st.cache_data(ttl=3600) # Cachea la matriz por 1 hora
+def run_radar_matrix(
+    _df_stock,
+    _df_consumo,
+    _df_oc,
+    lead_time_days,
+    service_level_z,
+    data_version=None,
+    _demand_cube=None,
+    _progress=None
+):
+    """
+    Ejecuta el radar para todas las combinaciones de bodegas (cacheado).
+    'data_version' (versión de 'data_store') entra en la clave del caché para
+    no entregar resultados de datos anteriores después de una recarga.
+    '_progress' (no entra en la clave del caché) recibe el avance del cálculo.
+    """
+    return radar_engine.compute_radar_matrix(
+        _df_stock,
+        _df_consumo,
+        _df_oc,
+        lead_time_days,
+        service_level_z,
+        demand_cube=_demand_cube,
+        progress=_progress
+    )
+
+
+@st.cache_data(ttl=3600) # Cachea el reporte por 1 hora
+def run_full_radar_analysis(
+    _df_stock,
+    _df_consumo,
+    _df_oc,
+    bodega_stock_sel,
+    bodega_consumo_sel,
+    lead_time_days,
+    service_level_z,
+    data_version=None,
+    _demand_cube=None,
+    _progress=None
+):
+    """
+    Ejecuta el cálculo de KPIs para todos los SKUs relevantes.
+    'data_version': ver 'run_radar_matrix'.
+    '_progress' (no entra en la clave del caché) recibe el avance del cálculo.
+    """
+    return radar_engine.compute_radar_kpis(
+        _df_stock,
+        _df_consumo,
+        _df_oc,
+        bodega_stock_sel,
+        bodega_consumo_sel,
+        lead_time_days,
+        service_level_z,
+        demand_cube=_demand_cube,
+        progress=_progress
+    )
+
+
+@st.cache_resource(max_entries=2) # Versión vigente y la anterior
+def get_buyer_rollup(data_version, _df_oc):
+    """
+    Cubo (Creador x día) de la página KPIs_Compradores, construido una vez
+    por versión de datos y compartido por todas las sesiones.
+    """
+    return buyer_rollup.build_buyer_rollup(_df_oc)
+
+
+@st.cache_resource(max_entries=2) # Versión vigente y la anterior
+def get_arrivals_index(data_version, _df_oc):
+    """
+    Índice de llegadas de la página ProximasLlegadas, construido una vez por
+    versión de datos y compartido por todas las sesiones.
+    """
+    return ArrivalsIndex(_df_oc)
+
+
+@st.cache_resource(max_entries=2) # Versión vigente y la anterior
+def get_sku_catalog(data_version, _df_stock, _df_consumo):
+    """
+    Catálogo de los SKUs de stock y consumo (opciones "SKU | Nombre",
+    nombres y búsqueda), construido una vez por versión de datos.
+    """
+    all_skus = sorted(
+        set(_df_stock['CodigoArticulo'].dropna().unique()) | set(_df_consumo['CodigoArticulo'].dropna().unique())
+    )
+    return SkuCatalog(all_skus, _df_stock)
+
+
+@st.cache_resource
+def get_simulation_cache():
+    """Caché de simulaciones por SKU, compartido por todas las sesiones."""
+    return ResultCache(max_entries=config.SIM_CACHE_MAX_ENTRIES, ttl_s=config.SIM_CACHE_TTL_S)
+
+
+def run_inventory_simulation(
+    sku_to_simulate,
+    warehouse_code,
+    consumption_warehouse,
+    simulation_days,
+    lead_time_days,
+    service_level_z,
+    data_version,
+    df_stock,
+    df_consumo,
+    df_oc,
+    row_indexes=None,
+    demand_cube=None
+):
+    """
+    'simulator.run_inventory_simulation' con caché de resultados (ver
+    'get_simulation_cache'). La clave es (SKU, bodegas, días, lead time, z,
+    versión de datos, fecha de hoy): volver a un SKU ya simulado no recalcula.
+
+    Los DataFrames se entregan como copia superficial (copy-on-write) y los
+    diccionarios como copia, para que nadie modifique el resultado guardado.
+    """
+    clave = (
+        sku_to_simulate, warehouse_code, consumption_warehouse,
+        simulation_days, lead_time_days, service_level_z,
+        data_version, pd.Timestamp.now().normalize() # La simulación parte hoy
+    )
+    df_sim, metrics, llegadas_map, df_llegadas_detalle = get_simulation_cache().get_or_compute(
+        clave,
+        lambda: simulator.run_inventory_simulation(
+            sku_to_simulate=sku_to_simulate,
+            warehouse_code=warehouse_code,
+            consumption_warehouse=consumption_warehouse,
+            df_stock_raw=df_stock,
+            df_consumo_raw=df_consumo,
+            df_oc_raw=df_oc,
+            simulation_days=simulation_days,
+            lead_time_days=lead_time_days,
+            service_level_z=service_level_z,
+            row_indexes=row_indexes,
+            demand_cube=demand_cube
+        )
+    )
+    return df_sim.copy(deep=False), dict(metrics), dict(llegadas_map), df_llegadas_detalle.copy(deep=False)
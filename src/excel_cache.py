@@ -0,0 +1,170 @@
+# --- ARCHIVO: src/excel_cache.py ---
+# (NUEVO ARCHIVO: caché columnar en disco para los Excel de 'data/')
+
+import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import config
+
+# Se incrementa cuando cambia la forma de convertir el Excel, para invalidar
+# todas las copias existentes.
+CACHE_FORMAT_VERSION = 1
+
+try:
+    import pyarrow.parquet as pq  # Motor de Parquet
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+
+def _file_sha256(path, chunk_size=1024 * 1024):
+    """Calcula el hash SHA-256 del contenido de un archivo."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(path, sheet_name):
+    """Retorna las rutas (parquet, metadata) de la copia cacheada de un Excel."""
+    cache_dir = Path(config.CACHE_DIR)
+    stem = f"{Path(path).stem}__{sheet_name}"
+    return cache_dir / f"{stem}.parquet", cache_dir / f"{stem}.json"
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def make_arrow_safe(df):
+    """
+    Normaliza las columnas 'object' con tipos mezclados (p. ej. fechas con una
+    fila de texto al final del export) para que puedan escribirse en Parquet.
+
+    Cada columna mixta se lleva al tipo dominante entre sus valores no nulos:
+    - fechas  -> datetime64 (el resto queda NaT)
+    - números -> numérico (el resto queda NaN)
+    - otro    -> texto
+    Es la misma coerción que luego aplican los 'to_datetime'/'to_numeric'
+    con errors='coerce' del resto de la app.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+
+        no_nulo = df[col].notna()
+        if not no_nulo.any():
+            continue
+
+        es_fecha = df[col].map(lambda v: isinstance(v, (datetime.date, np.datetime64))) & no_nulo
+        es_numero = df[col].map(
+            lambda v: isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool)
+        ) & no_nulo
+        es_texto = no_nulo & ~es_fecha & ~es_numero
+
+        conteos = {'fecha': es_fecha.sum(), 'numero': es_numero.sum(), 'texto': es_texto.sum()}
+        if sum(1 for n in conteos.values() if n > 0) < 2:
+            continue  # Columna homogénea: Arrow la infiere sin ayuda
+
+        dominante = max(conteos, key=conteos.get)
+        if dominante == 'fecha':
+            df[col] = pd.to_datetime(df[col].where(es_fecha), errors='coerce')
+        elif dominante == 'numero':
+            es_entero = df[col].map(lambda v: isinstance(v, (int, np.integer)))
+            df[col] = pd.to_numeric(df[col].where(es_numero), errors='coerce')
+            if es_entero[es_numero].all():
+                # Enteros con huecos (p. ej. N° de documento): se evita el '.0' de float
+                df[col] = df[col].astype('Int64')
+        else:
+            df[col] = df[col].where(~no_nulo, df[col].astype(str))
+    return df
+
+
+def _read_parquet_columns(parquet_path, columns):
+    """Lee la copia Parquet; con 'columns', solo esas columnas (las que existan)."""
+    if columns is not None:
+        existentes = set(pq.read_schema(parquet_path).names)
+        columns = [c for c in columns if c in existentes]
+    return pd.read_parquet(parquet_path, columns=columns, memory_map=True)
+
+
+def read_excel_cached(path, sheet_name=0, columns=None):
+    """
+    Lee un Excel usando una copia columnar (Parquet) en 'config.CACHE_DIR'.
+    Con 'columns' solo se leen esas columnas de la copia (las que no existan
+    en el archivo se omiten); la copia siempre guarda todas.
+
+    La copia se invalida automáticamente:
+    - Si mtime y tamaño coinciden con los registrados, se usa directo.
+    - Si cambiaron, se compara el hash del contenido; si es el mismo (p. ej.
+      el archivo solo fue copiado/tocado) se reutiliza y se actualiza el mtime.
+    - Si el contenido cambió, se vuelve a convertir el Excel.
+
+    Si pyarrow no está instalado, o la copia no puede escribirse, se cae a
+    'pd.read_excel' normal.
+
+    Lanza:
+    - FileNotFoundError: Si no existe el Excel de origen.
+    """
+    if not PARQUET_DISPONIBLE:
+        usecols = (lambda c: c in columns) if columns is not None else None
+        return pd.read_excel(path, sheet_name=sheet_name, usecols=usecols)
+
+    stat = os.stat(path)  # Lanza FileNotFoundError igual que read_excel
+    parquet_path, meta_path = _cache_paths(path, sheet_name)
+    meta = _read_meta(meta_path)
+
+    if meta and meta.get('version') == CACHE_FORMAT_VERSION and parquet_path.exists():
+        if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+            return _read_parquet_columns(parquet_path, columns)
+
+        content_hash = _file_sha256(path)
+        if meta['sha256'] == content_hash:
+            meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            _write_meta(meta_path, meta)
+            return _read_parquet_columns(parquet_path, columns)
+    else:
+        content_hash = _file_sha256(path)
+
+    # --- Conversión (solo la primera vez o si el contenido cambió) ---
+    print(f"Convirtiendo '{path}' a caché columnar...")
+    df = pd.read_excel(path, sheet_name=sheet_name)
+
+    try:
+        df_safe = make_arrow_safe(df)
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = parquet_path.with_suffix('.parquet.tmp')
+        df_safe.to_parquet(tmp_path)
+        os.replace(tmp_path, parquet_path)
+        _write_meta(meta_path, {
+            'version': CACHE_FORMAT_VERSION,
+            'source': str(path),
+            'sheet_name': sheet_name,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': content_hash,
+        })
+    except Exception as e:
+        print(f"No se pudo escribir la caché de '{path}': {e}")
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+    # Se lee de vuelta para que la primera carga tenga los mismos tipos que las siguientes
+    return _read_parquet_columns(parquet_path, columns)
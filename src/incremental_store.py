@@ -0,0 +1,272 @@
+# --- ARCHIVO: src/incremental_store.py ---
+# (NUEVO ARCHIVO: almacén local incremental para consumo (ST_OWTR) y OC (OPOR))
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import config
+from excel_cache import read_excel_cached, make_arrow_safe
+
+# Se incrementa cuando cambia el formato del almacén, para reconstruirlo.
+STORE_FORMAT_VERSION = 3
+
+# Columna del almacén con la clave de grupo de cada fila (ver '_line_keys')
+COL_CLAVE = '_clave_linea'
+
+
+def _store_paths(nombre):
+    """Retorna las rutas (parquet, estado) del almacén de una tabla."""
+    store_dir = Path(config.STORE_DIR)
+    return store_dir / f"{nombre}.parquet", store_dir / f"{nombre}.json"
+
+
+def _read_state(state_path):
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(state_path, state):
+    tmp_path = state_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+@contextmanager
+def _store_lock(nombre):
+    """
+    Lock del almacén de una tabla, entre procesos (CLI, app) y entre hilos
+    (refresco en segundo plano): el archivo '<nombre>.lock' se crea en
+    exclusiva y se borra al salir.
+
+    Un lock con más de 'config.STORE_LOCK_STALE_S' segundos se considera
+    abandonado (proceso terminado a la fuerza) y se reemplaza.
+
+    Lanza:
+    - TimeoutError: Si no se obtiene en 'config.STORE_LOCK_TIMEOUT_S' segundos.
+    """
+    lock_path = Path(config.STORE_DIR) / f"{nombre}.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    limite = time.monotonic() + config.STORE_LOCK_TIMEOUT_S
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > config.STORE_LOCK_STALE_S:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue # Se liberó entre medio
+            if time.monotonic() >= limite:
+                raise TimeoutError(f"El almacén '{nombre}' está en uso (lock: '{lock_path}').")
+            time.sleep(0.1)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+
+def _key_part(serie):
+    """Columna de la clave como texto; los números enteros sin decimales (123.0 -> '123')."""
+    numeros = pd.to_numeric(serie, errors='coerce')
+    texto = serie.astype(str)
+    enteros = numeros.notna() & (numeros % 1 == 0)
+    texto[enteros] = numeros[enteros].astype('int64').astype(str)
+    return texto
+
+
+def _line_keys(df, spec):
+    """
+    Clave de grupo de cada fila: las columnas de 'cols_linea' como un solo
+    texto. Se calcula al agregar las filas y se guarda en la columna
+    'COL_CLAVE' del almacén, así cada delta solo calcula las suyas.
+    """
+    partes = [_key_part(df[columna]) for columna in spec['cols_linea']]
+    clave = partes[0]
+    for parte in partes[1:]:
+        clave = clave + '\x1f' + parte
+    return clave.to_numpy()
+
+
+def _compute_watermark(df, spec):
+    """
+    Marca de agua: la mayor fecha de la tabla ({'fecha': iso}).
+    Retorna None si no hay filas con fecha.
+    """
+    fechas = pd.to_datetime(df[spec['col_fecha']], errors='coerce')
+    if fechas.notna().sum() == 0:
+        return None
+    return {'fecha': fechas.max().isoformat()}
+
+
+def _later_watermark(marca, otra):
+    """La más reciente de dos marcas de agua (cualquiera puede ser None)."""
+    if marca is None or otra is None:
+        return marca or otra
+    return max(marca, otra, key=lambda m: pd.Timestamp(m['fecha']))
+
+
+def _upsert_delta(df, df_delta, spec, watermark):
+    """
+    Aplica un delta al almacén: las filas de cada grupo 'cols_linea' del
+    delta reemplazan a TODAS las filas guardadas de ese grupo. El export no
+    trae N° de línea y un documento puede repetir un artículo, así que el
+    delta debe traer el grupo completo (si el export trae 'LineNum', basta
+    agregarla a 'cols_linea' para reemplazar línea a línea).
+
+    La marca de agua solo descarta grupos NUEVOS con fecha anterior a la de
+    la marca (los que ya están en el almacén se actualizan siempre). Las
+    filas sin fecha se ignoran. Ambas se cuentan como omitidas.
+
+    Retorna:
+    - tupla: (df actualizado, N° de filas nuevas, N° de filas que
+      reemplazan a un grupo existente, N° de filas omitidas)
+    """
+    claves_delta = _line_keys(df_delta, spec)
+    df_delta = df_delta.assign(**{COL_CLAVE: claves_delta})
+
+    # Grupos del delta que ya están en el almacén (la búsqueda usa la clave
+    # guardada: no se recalcula para la tabla completa)
+    en_almacen = df[COL_CLAVE].isin(pd.unique(claves_delta)).to_numpy()
+    existentes = df_delta[COL_CLAVE].isin(pd.unique(df[COL_CLAVE].to_numpy()[en_almacen])).to_numpy()
+
+    fechas = pd.to_datetime(df_delta[spec['col_fecha']], errors='coerce')
+    aplicar = fechas.notna().to_numpy()
+    if watermark is not None:
+        aplicar = aplicar & ((fechas >= pd.Timestamp(watermark['fecha'])).to_numpy() | existentes)
+    omitidas = int((~aplicar).sum())
+
+    if not aplicar.any():
+        return df, 0, 0, omitidas
+    reemplazados = en_almacen & df[COL_CLAVE].isin(pd.unique(claves_delta[aplicar])).to_numpy()
+    df = pd.concat([df[~reemplazados], df_delta[aplicar]], ignore_index=True)
+    actualizadas = int((existentes & aplicar).sum())
+    return df, int(aplicar.sum()) - actualizadas, actualizadas, omitidas
+
+
+def sync_table(nombre, desde=None):
+    """
+    Sincroniza el almacén local de una tabla de 'config.INCREMENTAL_TABLES'
+    y retorna su contenido.
+
+    - Primera vez (o si cambió el export completo 'base'): se construye desde
+      el Excel base.
+    - Luego solo se leen los archivos delta nuevos de 'config.INCREMENTAL_DIR'.
+      Cada grupo de líneas (clave 'cols_linea') reemplaza a su versión
+      anterior o se agrega (ver '_upsert_delta'): un delta repetido o
+      solapado no duplica filas, y los cambios de un grupo existente
+      (cantidad, fecha de entrega) se aplican.
+    - Si se indica 'desde', se descartan las filas anteriores a esa fecha
+      (las que salen de la ventana ya no vuelven salvo reconstrucción).
+
+    Todo el proceso corre bajo un lock del almacén (ver '_store_lock'): la
+    CLI y el refresco en segundo plano pueden sincronizar a la vez.
+
+    Cada refresco cuesta lo que pesan los deltas nuevos más la ventana
+    vigente, no el historial completo.
+
+    Lanza:
+    - FileNotFoundError: Si no existe el Excel base.
+    - TimeoutError: Si otro proceso mantiene el lock del almacén.
+    """
+    with _store_lock(nombre):
+        return _sync_table(nombre, desde)
+
+
+def _sync_table(nombre, desde):
+    """Cuerpo de 'sync_table' (con el lock del almacén tomado)."""
+    spec = config.INCREMENTAL_TABLES[nombre]
+    parquet_path, state_path = _store_paths(nombre)
+    state = _read_state(state_path)
+
+    stat = os.stat(spec['base'])  # Lanza FileNotFoundError igual que read_excel
+    firma_base = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    # --- 1. Carga inicial o almacén existente ---
+    if (
+        state is None
+        or state.get('version') != STORE_FORMAT_VERSION
+        or state.get('base') != firma_base
+        or not parquet_path.exists()
+    ):
+        print(f"Almacén '{nombre}': carga inicial desde '{spec['base']}'...")
+        df = read_excel_cached(spec['base'])
+        df = df.assign(**{COL_CLAVE: _line_keys(df, spec)})
+        state = {
+            'version': STORE_FORMAT_VERSION,
+            'base': firma_base,
+            'watermark': _compute_watermark(df, spec),
+            'deltas_procesados': [],
+        }
+        hay_cambios = True
+    else:
+        df = pd.read_parquet(parquet_path, memory_map=True)
+        hay_cambios = False
+
+    # --- 2. Deltas nuevos (en orden de nombre) ---
+    procesados = set(state['deltas_procesados'])
+    pendientes = [
+        p for p in sorted(Path(config.INCREMENTAL_DIR).glob(spec['patron_delta']))
+        if p.name not in procesados
+    ]
+
+    total_nuevas = total_actualizadas = 0
+    for delta_path in pendientes:
+        df_delta = pd.read_excel(delta_path)
+        df, nuevas, actualizadas, omitidas = _upsert_delta(df, df_delta, spec, state['watermark'])
+        if omitidas:
+            print(
+                f"Almacén '{nombre}': se omiten {omitidas} línea(s) de '{delta_path.name}' "
+                f"(nuevas con fecha anterior a la marca de agua, o sin fecha). "
+                f"Para incluirlas, reconstruya el almacén desde el export completo."
+            )
+        if nuevas or actualizadas:
+            # Las filas omitidas son anteriores a la marca: basta mirar el delta
+            state['watermark'] = _later_watermark(state['watermark'], _compute_watermark(df_delta, spec))
+        total_nuevas += nuevas
+        total_actualizadas += actualizadas
+        state['deltas_procesados'].append(delta_path.name)
+        hay_cambios = True
+
+    if pendientes:
+        print(
+            f"Almacén '{nombre}': {total_nuevas} líneas nuevas y {total_actualizadas} "
+            f"actualizadas de {len(pendientes)} delta(s)."
+        )
+
+    # --- 3. Ventana: descarta lo que quedó fuera ---
+    if desde is not None:
+        en_ventana = pd.to_datetime(df[spec['col_fecha']], errors='coerce') >= desde
+        if not en_ventana.all():
+            df = df[en_ventana]
+            hay_cambios = True
+
+    if not hay_cambios:
+        return df
+
+    # --- 4. Escritura atómica (datos y luego estado) ---
+    try:
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = parquet_path.with_suffix('.parquet.tmp')
+        make_arrow_safe(df.reset_index(drop=True)).to_parquet(tmp_path)
+        os.replace(tmp_path, parquet_path)
+        _write_state(state_path, state)
+    except Exception as e:
+        print(f"No se pudo escribir el almacén '{nombre}': {e}")
+        return df.reset_index(drop=True)
+
+    return pd.read_parquet(parquet_path, memory_map=True)
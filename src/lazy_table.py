@@ -0,0 +1,59 @@
+# --- ARCHIVO: src/lazy_table.py ---
+# (NUEVO ARCHIVO: tablas que se leen al primer uso, y solo con las columnas pedidas)
+
+import threading
+import pandas as pd
+from excel_cache import read_excel_cached # Lectura vía caché columnar
+
+
+class LazyTable:
+    """
+    Referencia a un archivo de 'data/' que no se lee al cargar la app, sino
+    la primera vez que una página llama a 'load'. Cada llamada lee de la
+    copia columnar solo las columnas que aún no se habían leído.
+
+    Uso:
+        tabla = st.session_state.df_residencial
+        df = tabla.load(['CodigoArticulo', 'Categoria'])
+    """
+
+    def __init__(self, path, reader=read_excel_cached):
+        self.path = path
+        self._reader = reader
+        self._lock = threading.Lock() # Compartida entre sesiones
+        self._df = None
+        self._completa = False # True si ya se leyeron todas las columnas
+        self._pedidas = set() # Columnas ya pedidas (existan o no en el archivo)
+
+    @property
+    def loaded(self):
+        """True si ya se leyó alguna columna."""
+        return self._df is not None
+
+    def load(self, columns=None):
+        """
+        Retorna la tabla con 'columns' (o todas si es None), leyendo del
+        archivo solo lo que falte. Las columnas que no existen en el
+        archivo se omiten. El resultado es una vista copy-on-write de la
+        copia compartida.
+
+        Lanza:
+        - FileNotFoundError: Si el archivo no existe.
+        """
+        with self._lock:
+            if columns is None:
+                if not self._completa:
+                    self._df = self._reader(self.path)
+                    self._completa = True
+            elif not self._completa:
+                faltan = [c for c in columns if c not in self._pedidas]
+                if faltan:
+                    nuevas = self._reader(self.path, columns=faltan)
+                    self._pedidas.update(faltan)
+                    # Misma copia columnar: las filas vienen en el mismo orden
+                    self._df = nuevas if self._df is None else pd.concat([self._df, nuevas], axis=1)
+            df = self._df
+
+        if columns is None:
+            return df.copy(deep=False)
+        return df[[c for c in columns if c in df.columns]]
@@ -0,0 +1,144 @@
+# --- ARCHIVO: src/parallel_radar.py ---
+# (NUEVO ARCHIVO: radar multi-bodega en paralelo por particiones de SKUs)
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import radar_engine
+from progress import as_reporter # Avance opcional (sin Streamlit)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    ARROW_DISPONIBLE = True
+except ImportError:
+    ARROW_DISPONIBLE = False
+
+# Columnas que necesita el radar de cada tabla, y la columna de SKU para particionar
+_TABLAS = {
+    'stock': (['CodigoBodega', 'CodigoArticulo', 'NombreArticulo', 'DisponibleParaPrometer'], 'CodigoArticulo'),
+    'consumo': (['BodegaDestino_Requerida', 'CodigoArticulo', 'FechaSolicitud', 'CantidadSolicitada'], 'CodigoArticulo'),
+    'oc': (['Número de artículo', 'Cantidad', 'Fecha de entrega de la línea'], 'Número de artículo'),
+}
+
+
+def _write_arrow_file(df, ruta):
+    """
+    Escribe 'df' como archivo Arrow IPC (los procesos lo abren con memory map).
+    Las columnas categóricas se guardan como texto: cada partición filtra sus
+    filas y un diccionario compartido no aporta nada.
+    """
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = pa.table(
+        [c.cast(c.type.value_type) if pa.types.is_dictionary(c.type) else c for c in tabla.columns],
+        names=tabla.column_names
+    )
+    with pa.OSFile(str(ruta), 'wb') as sink:
+        with pa.ipc.new_file(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+
+
+def _read_shard(ruta, columna_sku, skus):
+    """Lee (memory map, sin copiar el archivo) solo las filas de los SKUs de la partición."""
+    with pa.memory_map(str(ruta), 'r') as fuente:
+        tabla = pa.ipc.open_file(fuente).read_all()
+        filtro = pc.is_in(tabla[columna_sku], value_set=pa.array(skus, type=pa.string()))
+        return tabla.filter(filtro).to_pandas()
+
+
+def _radar_shard(rutas, skus, bodegas_stock, bodegas_consumo, lead_time_days, service_level_z):
+    """Trabajo de cada proceso: radar de una partición de SKUs."""
+    tablas = {
+        nombre: _read_shard(rutas[nombre], _TABLAS[nombre][1], skus)
+        for nombre in _TABLAS
+    }
+    return radar_engine.compute_radar_matrix(
+        tablas['stock'], tablas['consumo'], tablas['oc'],
+        lead_time_days, service_level_z,
+        bodegas_stock=bodegas_stock, bodegas_consumo=bodegas_consumo
+    )
+
+
+def compute_radar_matrix_parallel(
+    df_stock,
+    df_consumo,
+    df_oc,
+    lead_time_days,
+    service_level_z,
+    n_workers=None,
+    n_shards=None,
+    progress=None
+):
+    """
+    Misma salida que 'radar_engine.compute_radar_matrix', calculada en varios
+    procesos ('ProcessPoolExecutor').
+
+    - El universo de SKUs se divide en 'n_shards' particiones contiguas
+      (por defecto, una por proceso). Stock, consumo y OC se agregan por SKU,
+      así que cada partición es independiente.
+    - Las tablas se escriben una sola vez como archivos Arrow IPC en una
+      carpeta temporal; cada proceso las abre con memory map y solo
+      materializa las filas de su partición (no se serializan DataFrames).
+    - Las particiones se unen en orden y se ordena el índice, así el
+      resultado es determinista e idéntico al cálculo en un solo proceso.
+
+    Con un solo proceso, o sin pyarrow, se calcula directamente. 'progress'
+    recibe el avance por partición terminada (ver 'progress.as_reporter').
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers <= 1 or not ARROW_DISPONIBLE:
+        return radar_engine.compute_radar_matrix(df_stock, df_consumo, df_oc, lead_time_days, service_level_z, progress=progress)
+
+    # --- 1. Universo de SKUs y bodegas (global, igual para todas las particiones) ---
+    skus = sorted(
+        set(df_stock['CodigoArticulo'].dropna().unique()) |
+        set(df_consumo['CodigoArticulo'].dropna().unique())
+    )
+    if not skus:
+        return radar_engine.compute_radar_matrix(df_stock, df_consumo, df_oc, lead_time_days, service_level_z, progress=progress)
+
+    bodegas_stock = df_stock.dropna(subset=['CodigoBodega', 'CodigoArticulo'])['CodigoBodega'].unique()
+    bodegas_consumo = df_consumo.dropna(subset=['BodegaDestino_Requerida', 'CodigoArticulo'])['BodegaDestino_Requerida'].unique()
+
+    if n_shards is None:
+        n_shards = n_workers
+    progress = as_reporter(progress)
+    particiones = [list(p) for p in np.array_split(np.array(skus, dtype=object), min(n_shards, len(skus)))]
+
+    # --- 2. Tablas compartidas (Arrow IPC con memory map) ---
+    carpeta = Path(tempfile.mkdtemp(prefix='radar_shards_'))
+    try:
+        rutas = {}
+        for nombre, df in (('stock', df_stock), ('consumo', df_consumo), ('oc', df_oc)):
+            rutas[nombre] = carpeta / f"{nombre}.arrow"
+            _write_arrow_file(df[_TABLAS[nombre][0]], rutas[nombre])
+
+        # --- 3. Ejecución en paralelo (orden de particiones preservado) ---
+        # 'spawn' evita heredar hilos del proceso padre (p. ej. los de pyarrow).
+        # Cada proceso re-importa el módulo principal: usar desde 'cli.py', no desde las páginas.
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            resultados = []
+            for resultado in pool.map(
+                _radar_shard,
+                [rutas] * len(particiones),
+                particiones,
+                [bodegas_stock] * len(particiones),
+                [bodegas_consumo] * len(particiones),
+                [lead_time_days] * len(particiones),
+                [service_level_z] * len(particiones),
+            ):
+                resultados.append(resultado)
+                progress.step(len(resultados), len(particiones), f"Particiones listas: {len(resultados)}/{len(particiones)}")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+    # 'infer_objects': una partición sin llegadas deja 'Próx. Llegada' como
+    # object; así queda con el mismo tipo que el cálculo en un solo proceso.
+    return pd.concat(resultados).sort_index().infer_objects()
@@ -0,0 +1,66 @@
+# --- ARCHIVO: src/progress.py ---
+# (NUEVO ARCHIVO: reporte de avance de los motores, sin depender de Streamlit)
+#
+# Los motores reciben 'progress' (None, una función f(fraccion, texto) o un
+# ProgressReporter) y llaman a 'update'. Sin callback (CLI, benchmarks) no hace
+# nada; en las páginas el callback es la barra de 'ui_helpers.streamlit_progress'.
+
+import time
+
+# Límites por defecto: cada actualización de la barra es un mensaje al navegador
+MIN_INTERVAL_MS = 250
+MIN_STEP = 0.05
+
+
+class ProgressReporter:
+    """
+    Reenvía el avance (0 a 1) a un callback, como máximo una vez cada
+    'min_interval_ms' milisegundos o cada 'min_step' de avance (lo que ocurra
+    primero). El primer reporte y el final (1.0) siempre se envían.
+    """
+
+    def __init__(self, callback=None, min_interval_ms=MIN_INTERVAL_MS, min_step=MIN_STEP, clock=time.monotonic):
+        self.callback = callback
+        self.min_interval_ms = min_interval_ms
+        self.min_step = min_step
+        self._clock = clock
+        self._ultimo_instante = None
+        self._ultima_fraccion = None
+        self.enviados = 0
+
+    def update(self, fraccion, texto=""):
+        """Reporta 'fraccion' (0 a 1) con un texto; se descarta si es muy seguido."""
+        if self.callback is None:
+            return
+        fraccion = min(max(float(fraccion), 0.0), 1.0)
+        ahora = self._clock()
+
+        if self._ultimo_instante is not None and fraccion < 1.0:
+            transcurrido_ms = (ahora - self._ultimo_instante) * 1000
+            if transcurrido_ms < self.min_interval_ms and fraccion - self._ultima_fraccion < self.min_step:
+                return
+
+        self._ultimo_instante = ahora
+        self._ultima_fraccion = fraccion
+        self.enviados += 1
+        self.callback(fraccion, texto)
+
+    def step(self, hechos, total, texto=""):
+        """Atajo para 'update(hechos / total)'."""
+        self.update(hechos / total if total else 1.0, texto)
+
+    def finish(self, texto=""):
+        """Reporta el 100% (siempre se envía)."""
+        self.update(1.0, texto)
+
+
+def as_reporter(progress):
+    """
+    Normaliza el parámetro 'progress' de los motores:
+    - None: reporter sin callback (no hace nada)
+    - ProgressReporter: se usa tal cual
+    - función f(fraccion, texto): se envuelve con los límites por defecto
+    """
+    if isinstance(progress, ProgressReporter):
+        return progress
+    return ProgressReporter(progress)
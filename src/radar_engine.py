@@ -1,190 +1,255 @@
 # --- ARCHIVO: src/radar_engine.py ---
 # (NUEVO ARCHIVO para la lógica de análisis masivo)
+# (Vectorizado: todos los SKUs se calculan a la vez con agregaciones por grupo)
+# (Sin Streamlit: los envoltorios cacheados de las páginas están en 'engine_cache.py')
 
 import pandas as pd
 import numpy as np
-import streamlit as st
-from src import config # Importa la configuración
-
-def _calculate_sku_kpis(
-    sku, 
-    df_stock_sku, 
-    df_consumo_sku, 
-    df_oc_sku, 
-    mapa_nombres,
-    lead_time_days, 
-    service_level_z
-):
+import config # Importa la configuración
+import aggregations # Agregaciones por grupo compartidas
+from demand_cube import is_cube_current, warehouse_stats
+from progress import as_reporter # Avance opcional (sin Streamlit)
+
+# Orden de columnas del reporte
+RADAR_COLUMNS = [
+    "SKU", "Nombre", "Stock Actual", "DOS (Días)", "Alerta Stock (vs SS)",
+    "Stock Proy. (en LT)", "ROP", "Alerta Proy. (vs ROP)", "Pedido Sugerido",
+    "Próx. Llegada", "Demanda Prom. Diaria"
+]
+
+
+def _arrivals_for(llegadas, index):
     """
-    Calcula los KPIs clave para un solo SKU.
-    Es una versión "lite" del motor de simulación.
+    'llegadas_en_lt' y 'proxima_llegada' (de 'aggregations.arrivals_by_sku')
+    alineadas a 'index'; los SKUs sin llegadas quedan con 0 y sin fecha.
     """
-    try:
-        today = pd.Timestamp.now().floor('D')
-        
-        # --- 1. Stock Inicial ---
-        initial_stock = pd.to_numeric(df_stock_sku['DisponibleParaPrometer'], errors='coerce').sum()
-
-        # --- 2. Métricas de Demanda ---
-        daily_demand_mean = 0.0
-        daily_demand_std = 0.0
-        monthly_demand_mean = 0.0
-
-        if not df_consumo_sku.empty:
-            start_of_current_month = today.replace(day=1)
-            
-            df_consumo_indexed = df_consumo_sku.set_index('FechaSolicitud')
-            consumo_mensual = df_consumo_indexed.resample('MS')['CantidadSolicitada'].sum()
-            
-            consumo_historico = consumo_mensual[consumo_mensual.index < start_of_current_month]
-            
-            if len(consumo_historico) > 1:
-                monthly_demand_mean = consumo_historico.mean()
-                monthly_demand_std = consumo_historico.std()
-                daily_demand_mean = monthly_demand_mean / config.AVERAGE_DAYS_PER_MONTH
-                daily_demand_std = monthly_demand_std / np.sqrt(config.AVERAGE_DAYS_PER_MONTH)
-            elif len(consumo_historico) == 1:
-                monthly_demand_mean = consumo_historico.mean()
-                daily_demand_mean = monthly_demand_mean / config.AVERAGE_DAYS_PER_MONTH
-
-        # --- 3. Días de Cobertura (DOS) ---
-        if daily_demand_mean > 0:
-            days_of_supply = initial_stock / daily_demand_mean
-        else:
-            days_of_supply = np.inf # O 0, según prefieras
-            
-        # --- 4. SS y ROP ---
-        demand_during_lead_time = daily_demand_mean * lead_time_days
-        std_dev_during_lead_time = daily_demand_std * np.sqrt(lead_time_days)
-        safety_stock = service_level_z * std_dev_during_lead_time
-        reorder_point = demand_during_lead_time + safety_stock
-
-        # --- 5. Llegadas (OCs) ---
-        df_llegadas = df_oc_sku[
-            (df_oc_sku['Cantidad'] > 0) & 
-            (df_oc_sku['Fecha de entrega de la línea'] >= today)
-        ]
-        
-        llegadas_map = df_llegadas.groupby('Fecha de entrega de la línea')['Cantidad'].sum()
-        
-        next_arrival_date = df_llegadas['Fecha de entrega de la línea'].min()
-        if pd.isna(next_arrival_date):
-            next_arrival_date = None
-        else:
-            next_arrival_date = next_arrival_date.strftime('%Y-%m-%d')
-
-        # --- 6. Lógica de Recomendación (Proyectada) ---
-        forecast_date = today + pd.DateOffset(days=lead_time_days)
-        
-        # Suma llegadas DENTRO del Lead Time
-        llegadas_en_lt = llegadas_map[llegadas_map.index <= forecast_date].sum()
-        
-        # Proyección simple: Stock + Llegadas - Consumo
-        projected_stock_at_lt = initial_stock + llegadas_en_lt - (daily_demand_mean * lead_time_days)
-
-        suggested_order_qty = 0.0
-        if projected_stock_at_lt < reorder_point:
-            suggested_order_qty = reorder_point - projected_stock_at_lt
-            suggested_order_qty = max(0.0, suggested_order_qty)
-
-        # --- 7. Alertas ---
-        alert_stock_actual = initial_stock < safety_stock
-        alert_proyectada = projected_stock_at_lt < reorder_point
-
-        return {
-            "SKU": sku,
-            "Nombre": mapa_nombres.get(sku, "N/A"),
-            "Stock Actual": initial_stock,
-            "DOS (Días)": days_of_supply,
-            "Alerta Stock (vs SS)": "🔴" if alert_stock_actual else "🟢",
-            "Stock Proy. (en LT)": projected_stock_at_lt,
-            "ROP": reorder_point,
-            "Alerta Proy. (vs ROP)": "🔴" if alert_proyectada else "🟢",
-            "Pedido Sugerido": suggested_order_qty,
-            "Próx. Llegada": next_arrival_date,
-            "Demanda Prom. Diaria": daily_demand_mean
-        }
-    
-    except Exception as e:
-        print(f"Error procesando SKU {sku}: {e}")
-        return None
-
-
-@st.cache_data(ttl=3600) # Cachea el reporte por 1 hora
-def run_full_radar_analysis(
-    _df_stock, 
-    _df_consumo, 
-    _df_oc,
+    if llegadas.empty:
+        # Sin OC por llegar (ventana vacía o todo entregado). No se reindexa:
+        # pandas no alinea un índice categórico vacío con las categorías compartidas
+        return np.zeros(len(index)), np.full(len(index), np.nan, dtype=object)
+    return (
+        llegadas['llegadas_en_lt'].reindex(index, fill_value=0.0).to_numpy(),
+        llegadas['proxima_llegada'].reindex(index).to_numpy(),
+    )
+
+
+def _build_kpi_frame(base, mapa_nombres, lead_time_days, service_level_z):
+    """
+    Calcula los KPIs del radar sobre una tabla con una fila por SKU.
+
+    'base' debe traer las columnas: SKU, initial_stock, monthly_mean,
+    monthly_std, llegadas_en_lt, proxima_llegada.
+    """
+    initial_stock = base['initial_stock']
+
+    # --- Métricas de Demanda ---
+    daily_demand_mean = base['monthly_mean'] / config.AVERAGE_DAYS_PER_MONTH
+    daily_demand_std = base['monthly_std'] / np.sqrt(config.AVERAGE_DAYS_PER_MONTH)
+
+    # --- Días de Cobertura (DOS) ---
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_supply = (initial_stock / daily_demand_mean).where(daily_demand_mean > 0, np.inf)
+
+    # --- SS y ROP ---
+    demand_during_lead_time = daily_demand_mean * lead_time_days
+    std_dev_during_lead_time = daily_demand_std * np.sqrt(lead_time_days)
+    safety_stock = service_level_z * std_dev_during_lead_time
+    reorder_point = demand_during_lead_time + safety_stock
+
+    # --- Proyección simple: Stock + Llegadas - Consumo ---
+    projected_stock_at_lt = initial_stock + base['llegadas_en_lt'] - (daily_demand_mean * lead_time_days)
+
+    alert_stock_actual = initial_stock < safety_stock
+    alert_proyectada = projected_stock_at_lt < reorder_point
+
+    suggested_order_qty = (reorder_point - projected_stock_at_lt).where(alert_proyectada, 0.0).clip(lower=0.0)
+
+    # Nombre (o "N/A") y próxima llegada (o None), sin recorrer fila a fila
+    claves_nombres = pd.Index(list(mapa_nombres.keys()))
+    posiciones = claves_nombres.get_indexer(base['SKU'])
+    nombres = np.append(np.array(list(mapa_nombres.values()), dtype=object), "N/A")[posiciones]
+
+    proxima_llegada = base['proxima_llegada'].to_numpy(dtype=object, copy=True)
+    proxima_llegada[pd.isna(proxima_llegada)] = None
+
+    df_results = pd.DataFrame({
+        "SKU": base['SKU'],
+        "Nombre": nombres,
+        "Stock Actual": initial_stock,
+        "DOS (Días)": days_of_supply,
+        "Alerta Stock (vs SS)": np.where(alert_stock_actual, "🔴", "🟢"),
+        "Stock Proy. (en LT)": projected_stock_at_lt,
+        "ROP": reorder_point,
+        "Alerta Proy. (vs ROP)": np.where(alert_proyectada, "🔴", "🟢"),
+        "Pedido Sugerido": suggested_order_qty,
+        "Próx. Llegada": proxima_llegada,
+        "Demanda Prom. Diaria": daily_demand_mean,
+    })
+    return df_results[RADAR_COLUMNS]
+
+
+def compute_radar_kpis(
+    df_stock,
+    df_consumo,
+    df_oc,
     bodega_stock_sel,
     bodega_consumo_sel,
     lead_time_days,
-    service_level_z
+    service_level_z,
+    demand_cube=None,
+    progress=None
 ):
     """
-    Ejecuta el cálculo de KPIs para todos los SKUs relevantes.
+    Calcula los KPIs del radar para todos los SKUs de un par de bodegas
+    (stock, consumo) con agregaciones por grupo sobre las tablas completas.
+
+    'df_oc' es la tabla de OC normalizada por 'data_loader' (fechas y
+    cantidades ya convertidas). Si se entrega 'demand_cube' (y es del mes
+    actual) la demanda se lee de ahí. 'progress' recibe el avance por etapa
+    (ver 'progress.as_reporter').
     """
-    
-    # --- 1. Preparar Datos (Filtros y Mapas) ---
-    df_stock = _df_stock[_df_stock['CodigoBodega'] == bodega_stock_sel].copy()
-    df_consumo = _df_consumo[_df_consumo['BodegaDestino_Requerida'] == bodega_consumo_sel].copy()
-    
-    # Pre-limpieza de OCs
-    df_oc = _df_oc.copy()
-    df_oc['Fecha de entrega de la línea'] = pd.to_datetime(df_oc['Fecha de entrega de la línea'], format='%Y-m-%d', errors='coerce')
-    df_oc['Cantidad'] = pd.to_numeric(df_oc['Cantidad'], errors='coerce')
+    progress = as_reporter(progress)
+    today = pd.Timestamp.now().floor('D')
 
-    # Mapa de nombres
-    mapa_nombres = _df_stock.drop_duplicates(subset=['CodigoArticulo']).set_index('CodigoArticulo')['NombreArticulo'].to_dict()
+    # --- 1. Filtros por bodega ---
+    progress.update(0.0, "Filtrando bodegas...")
+    df_stock_sel = df_stock[df_stock['CodigoBodega'] == bodega_stock_sel]
+    df_consumo_sel = df_consumo[df_consumo['BodegaDestino_Requerida'] == bodega_consumo_sel]
 
     # Lista de SKUs a procesar (todos los que tienen stock o consumo)
-    skus_stock = df_stock['CodigoArticulo'].unique()
-    skus_consumo = df_consumo['CodigoArticulo'].unique()
-    all_skus = sorted(list(set(skus_stock) | set(skus_consumo)))
-    
-    results_list = []
-    
-    # Barra de progreso
-    progress_bar = st.progress(0, text="Iniciando análisis masivo...")
-
-    # --- 2. Iterar por cada SKU ---
-    for i, sku in enumerate(all_skus):
-        
-        # Filtrar dataframes para este SKU (eficiente)
-        df_stock_sku = df_stock[df_stock['CodigoArticulo'] == sku]
-        df_consumo_sku = df_consumo[df_consumo['CodigoArticulo'] == sku]
-        df_oc_sku = df_oc[df_oc['Número de artículo'] == sku]
-        
-        # Calcular KPIs
-        kpis = _calculate_sku_kpis(
-            sku, 
-            df_stock_sku, 
-            df_consumo_sku, 
-            df_oc_sku, 
-            mapa_nombres,
-            lead_time_days, 
-            service_level_z
-        )
-        
-        if kpis:
-            results_list.append(kpis)
-            
-        # Actualizar barra de progreso
-        progress_bar.progress((i + 1) / len(all_skus), text=f"Procesando SKU: {sku} ({i+1}/{len(all_skus)})")
-
-    progress_bar.empty() # Limpiar barra
-    
-    if not results_list:
-        return pd.DataFrame() # Retorna DF vacío si no hay resultados
-
-    # --- 3. Retornar DataFrame final ---
-    df_results = pd.DataFrame(results_list)
-    
-    # Organizar columnas
-    column_order = [
-        "SKU", "Nombre", "Stock Actual", "DOS (Días)", "Alerta Stock (vs SS)",
-        "Stock Proy. (en LT)", "ROP", "Alerta Proy. (vs ROP)", "Pedido Sugerido",
-        "Próx. Llegada", "Demanda Prom. Diaria"
-    ]
-    df_results = df_results[column_order]
-    
-    return df_results
\ No newline at end of file
+    all_skus = sorted(
+        set(df_stock_sel['CodigoArticulo'].dropna().unique()) |
+        set(df_consumo_sel['CodigoArticulo'].dropna().unique())
+    )
+    if not all_skus:
+        progress.finish()
+        return pd.DataFrame()
+
+    # --- 2. Agregaciones por SKU ---
+    progress.update(0.2, f"Agregando stock, consumo y OC ({len(all_skus)} SKUs)...")
+    stock = aggregations.initial_stock_by(df_stock_sel, ['CodigoArticulo'])
+    if is_cube_current(demand_cube, today):
+        demanda = warehouse_stats(demand_cube, bodega_consumo_sel)
+    else:
+        demanda = aggregations.demand_stats_by(df_consumo_sel, ['CodigoArticulo'], today)
+    llegadas = aggregations.arrivals_by_sku(df_oc, today, lead_time_days)
+
+    sku_index = pd.Index(all_skus, name='SKU')
+    llegadas_en_lt, proxima_llegada = _arrivals_for(llegadas, sku_index)
+    base = pd.DataFrame({
+        'SKU': all_skus,
+        'initial_stock': stock.reindex(sku_index, fill_value=0).to_numpy(),
+        'monthly_mean': demanda['monthly_mean'].reindex(sku_index, fill_value=0.0).to_numpy(),
+        'monthly_std': demanda['monthly_std'].reindex(sku_index, fill_value=0.0).to_numpy(),
+        'llegadas_en_lt': llegadas_en_lt,
+        'proxima_llegada': proxima_llegada,
+    })
+
+    # Mapa de nombres
+    mapa_nombres = df_stock.drop_duplicates(subset=['CodigoArticulo']).set_index('CodigoArticulo')['NombreArticulo'].to_dict()
+
+    # --- 3. KPIs ---
+    progress.update(0.8, "Calculando KPIs...")
+    df_results = _build_kpi_frame(base, mapa_nombres, lead_time_days, service_level_z)
+    progress.finish(f"{len(df_results)} SKUs analizados.")
+    return df_results
+
+
+def compute_radar_matrix(
+    df_stock,
+    df_consumo,
+    df_oc,
+    lead_time_days,
+    service_level_z,
+    demand_cube=None,
+    bodegas_stock=None,
+    bodegas_consumo=None,
+    progress=None
+):
+    """
+    Calcula los KPIs del radar para TODAS las combinaciones
+    (bodega de stock x bodega de consumo) en una sola pasada agrupada.
+
+    Retorna un DataFrame con MultiIndex ('Bodega Stock', 'Bodega Consumo', 'SKU')
+    y las columnas del radar. Cambiar de bodega es un slice (ver
+    'slice_radar_matrix') en vez de un recálculo.
+
+    'bodegas_stock' / 'bodegas_consumo' fijan el universo de bodegas (por
+    defecto, las presentes en las tablas). Sirven para calcular por partes
+    (p. ej. un subconjunto de SKUs) con el mismo resultado que la tabla completa.
+    'progress' recibe el avance por etapa (ver 'progress.as_reporter').
+    """
+    progress = as_reporter(progress)
+    today = pd.Timestamp.now().floor('D')
+    niveles = ['Bodega Stock', 'Bodega Consumo', 'SKU']
+
+    # --- 1. Universo de filas: por cada par, SKUs con stock o con consumo ---
+    progress.update(0.0, "Armando combinaciones de bodegas y SKUs...")
+    claves_stock = df_stock[['CodigoBodega', 'CodigoArticulo']].dropna().drop_duplicates()
+    claves_stock.columns = ['Bodega Stock', 'SKU']
+    claves_consumo = df_consumo[['BodegaDestino_Requerida', 'CodigoArticulo']].dropna().drop_duplicates()
+    claves_consumo.columns = ['Bodega Consumo', 'SKU']
+
+    if bodegas_stock is None:
+        bodegas_stock = claves_stock['Bodega Stock'].unique()
+    if bodegas_consumo is None:
+        bodegas_consumo = claves_consumo['Bodega Consumo'].unique()
+    bodegas_stock = pd.DataFrame({'Bodega Stock': bodegas_stock})
+    bodegas_consumo = pd.DataFrame({'Bodega Consumo': bodegas_consumo})
+
+    universo = pd.concat([
+        claves_stock.merge(bodegas_consumo, how='cross'),
+        claves_consumo.merge(bodegas_stock, how='cross'),
+    ], ignore_index=True)[niveles].drop_duplicates()
+
+    if universo.empty:
+        progress.finish()
+        return pd.DataFrame(columns=RADAR_COLUMNS[1:], index=pd.MultiIndex.from_arrays([[], [], []], names=niveles))
+
+    universo = universo.sort_values(niveles, ignore_index=True)
+
+    # --- 2. Agregaciones (una sola vez para todas las bodegas) ---
+    progress.update(0.3, f"Agregando stock, consumo y OC ({len(universo)} filas)...")
+    stock = aggregations.initial_stock_by(df_stock, ['CodigoBodega', 'CodigoArticulo'])
+    if is_cube_current(demand_cube, today):
+        demanda = demand_cube['stats'] # Mismas claves (bodega de consumo, SKU)
+    else:
+        demanda = aggregations.demand_stats_by(df_consumo, ['BodegaDestino_Requerida', 'CodigoArticulo'], today)
+    llegadas = aggregations.arrivals_by_sku(df_oc, today, lead_time_days)
+
+    idx_stock = pd.MultiIndex.from_frame(universo[['Bodega Stock', 'SKU']])
+    idx_consumo = pd.MultiIndex.from_frame(universo[['Bodega Consumo', 'SKU']])
+    idx_sku = pd.Index(universo['SKU'])
+    llegadas_en_lt, proxima_llegada = _arrivals_for(llegadas, idx_sku)
+
+    base = pd.DataFrame({
+        'SKU': universo['SKU'],
+        'initial_stock': stock.reindex(idx_stock, fill_value=0).to_numpy(),
+        'monthly_mean': demanda['monthly_mean'].reindex(idx_consumo, fill_value=0.0).to_numpy(),
+        'monthly_std': demanda['monthly_std'].reindex(idx_consumo, fill_value=0.0).to_numpy(),
+        'llegadas_en_lt': llegadas_en_lt,
+        'proxima_llegada': proxima_llegada,
+    })
+
+    mapa_nombres = df_stock.drop_duplicates(subset=['CodigoArticulo']).set_index('CodigoArticulo')['NombreArticulo'].to_dict()
+
+    # --- 3. KPIs ---
+    progress.update(0.8, "Calculando KPIs...")
+    df_results = _build_kpi_frame(base, mapa_nombres, lead_time_days, service_level_z)
+    # Etiquetas como texto (no categorías): mismo índice que el cálculo por partes
+    df_results.index = pd.MultiIndex.from_frame(universo[niveles].astype(str))
+    progress.finish(f"{len(df_results)} filas calculadas.")
+    return df_results.drop(columns='SKU')
+
+
+def slice_radar_matrix(df_matriz, bodega_stock_sel, bodega_consumo_sel):
+    """
+    Extrae de la matriz multi-bodega el reporte de un par de bodegas, con el
+    mismo formato que 'compute_radar_kpis'.
+    """
+    try:
+        df_par = df_matriz.loc[(bodega_stock_sel, bodega_consumo_sel)]
+    except KeyError:
+        return pd.DataFrame()
+
+    return df_par.reset_index()[RADAR_COLUMNS]
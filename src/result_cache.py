@@ -0,0 +1,68 @@
+# --- ARCHIVO: src/result_cache.py ---
+# (NUEVO ARCHIVO: caché acotado de resultados (LRU + vencimiento) con contadores)
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Caché en memoria de resultados de cálculo, seguro entre hilos (sesiones).
+
+    - max_entries: tamaño máximo; al llenarse se descarta la entrada usada
+      hace más tiempo (LRU).
+    - ttl_s: segundos de vida de cada entrada (None = sin vencimiento).
+    - Contadores 'hits' / 'misses' (ver 'stats').
+
+    Las claves deben incluir todo lo que cambia el resultado (parámetros y
+    versión de los datos).
+    """
+
+    def __init__(self, max_entries=256, ttl_s=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._entradas = OrderedDict() # clave -> (instante, resultado)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, clave, calcular):
+        """
+        Retorna el resultado guardado para 'clave', o llama a 'calcular()' y
+        lo guarda. El cálculo se hace fuera del lock: otras sesiones no esperan.
+        """
+        ahora = self._clock()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and (self.ttl_s is None or ahora - entrada[0] < self.ttl_s):
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+                return entrada[1]
+            self.misses += 1
+
+        resultado = calcular()
+
+        with self._lock:
+            self._entradas[clave] = (self._clock(), resultado)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+        return resultado
+
+    def clear(self):
+        """Vacía el caché (los contadores se mantienen)."""
+        with self._lock:
+            self._entradas.clear()
+
+    def stats(self):
+        """Diccionario con 'hits', 'misses', 'hit_rate' y 'entries'."""
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / consultas if consultas else 0.0,
+                'entries': len(self._entradas),
+            }
@@ -0,0 +1,50 @@
+# --- ARCHIVO: src/row_index.py ---
+# (NUEVO ARCHIVO: índices de filas por (SKU, bodega) para no recorrer las tablas completas)
+
+import numpy as np
+
+# Claves de cada tabla, en el orden en que se consultan
+STOCK_KEYS = ['CodigoArticulo', 'CodigoBodega']
+CONSUMO_KEYS = ['CodigoArticulo', 'BodegaDestino_Requerida']
+OC_KEYS = ['Número de artículo']
+
+_SIN_FILAS = np.array([], dtype=np.intp)
+
+
+def build_row_index(df, keys):
+    """
+    Construye un diccionario {(clave1, clave2, ...): posiciones} con las
+    posiciones (iloc, en orden ascendente) de las filas de cada grupo.
+
+    Las claves siempre son tuplas, aunque 'keys' tenga una sola columna.
+    Las filas con alguna clave nula quedan fuera (igual que un filtro '==').
+    """
+    if df is None or df.empty:
+        return {}
+
+    grupos = df.groupby(keys, observed=True, sort=False).indices
+    if len(keys) == 1:
+        return {(clave,): posiciones for clave, posiciones in grupos.items()}
+    return dict(grupos)
+
+
+def build_table_indexes(df_stock, df_oc, df_consumo):
+    """
+    Índices de filas de las tablas principales:
+    - 'stock':   (SKU, bodega de stock)
+    - 'consumo': (SKU, bodega de consumo)
+    - 'oc':      (SKU,)
+    """
+    return {
+        'stock': build_row_index(df_stock, STOCK_KEYS),
+        'consumo': build_row_index(df_consumo, CONSUMO_KEYS),
+        'oc': build_row_index(df_oc, OC_KEYS),
+    }
+
+
+def take_rows(df, row_index, *key):
+    """
+    Retorna las filas de 'df' para la clave dada, en el mismo orden que el
+    filtro booleano equivalente (vacío si la clave no existe).
+    """
+    return df.iloc[row_index.get(key, _SIN_FILAS)]
@@ -0,0 +1,95 @@
+# --- ARCHIVO: src/schema.py ---
+# (NUEVO ARCHIVO: tipos compactos de las tablas cargadas, aplicados una sola vez al cargar)
+
+import pandas as pd
+
+# Columnas categóricas de cada tabla y el dominio de códigos que comparten:
+# las columnas con el mismo dominio usan el MISMO CategoricalDtype, así un
+# SKU tiene el mismo código en stock, consumo y OC.
+CATEGORICAL_COLUMNS = {
+    'stock': {'CodigoArticulo': 'sku', 'CodigoBodega': 'bodega_stock', 'NombreArticulo': 'nombre'},
+    'consumo': {'CodigoArticulo': 'sku', 'BodegaDestino_Requerida': 'bodega_consumo'},
+    'oc': {'Número de artículo': 'sku', 'Creador': 'creador'},
+}
+
+# Columnas numéricas (se convierten una vez). Cantidades y montos mantienen
+# 64 bits: se suman por grupo y un tipo más chico podría desbordarse o
+# cambiar los resultados de SS/ROP.
+NUMERIC_COLUMNS = {
+    'stock': ['DisponibleParaPrometer'],
+    'consumo': ['CantidadSolicitada'],
+    'oc': ['Cantidad', 'Total_Linea'],
+}
+
+# Identificadores enteros: se reducen al entero más chico que los contiene
+INTEGER_ID_COLUMNS = {
+    'stock': [],
+    'consumo': ['DocNum'],
+    'oc': [],
+}
+
+# Columnas de fecha (datetime64)
+DATE_COLUMNS = {
+    'stock': [],
+    'consumo': ['FechaSolicitud'],
+    'oc': ['Fecha de contabilización', 'Fecha de entrega de la línea'],
+}
+
+
+def _as_text(serie):
+    """Valores no nulos como texto (p. ej. SKUs numéricos), nulos intactos."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype(object)
+    return serie.where(serie.isna(), serie.astype(str))
+
+
+def shared_dtypes(tablas):
+    """
+    Un CategoricalDtype por dominio con las categorías (ordenadas) de todas
+    las columnas de ese dominio en 'tablas' ({'stock': df, 'consumo': df, 'oc': df}).
+    """
+    valores = {}
+    for nombre, df in tablas.items():
+        for columna, dominio in CATEGORICAL_COLUMNS[nombre].items():
+            if columna in df.columns:
+                valores.setdefault(dominio, set()).update(_as_text(df[columna]).dropna().unique())
+    return {dominio: pd.CategoricalDtype(sorted(vals)) for dominio, vals in valores.items()}
+
+
+def _compact_id(serie):
+    """Identificador numérico: si todos son enteros, al entero más chico (int8..int64)."""
+    serie = pd.to_numeric(serie, errors='coerce')
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return pd.to_numeric(serie, downcast='integer')
+    return serie
+
+
+def apply_schema(df_stock, df_oc, df_consumo):
+    """
+    Aplica los tipos de 'CATEGORICAL_COLUMNS', 'NUMERIC_COLUMNS',
+    'INTEGER_ID_COLUMNS' y 'DATE_COLUMNS' a las tres tablas (las columnas
+    ausentes se omiten).
+
+    Retorna:
+    - tupla: (df_stock, df_oc, df_consumo)
+    """
+    tablas = {'stock': df_stock, 'oc': df_oc, 'consumo': df_consumo}
+    dtypes = shared_dtypes(tablas)
+
+    for nombre, df in tablas.items():
+        cambios = {}
+        for columna, dominio in CATEGORICAL_COLUMNS[nombre].items():
+            if columna in df.columns:
+                cambios[columna] = _as_text(df[columna]).astype(dtypes[dominio])
+        for columna in NUMERIC_COLUMNS[nombre]:
+            if columna in df.columns and not pd.api.types.is_numeric_dtype(df[columna]):
+                cambios[columna] = pd.to_numeric(df[columna], errors='coerce')
+        for columna in INTEGER_ID_COLUMNS[nombre]:
+            if columna in df.columns:
+                cambios[columna] = _compact_id(df[columna])
+        for columna in DATE_COLUMNS[nombre]:
+            if columna in df.columns and not pd.api.types.is_datetime64_any_dtype(df[columna]):
+                cambios[columna] = pd.to_datetime(df[columna], errors='coerce')
+        tablas[nombre] = df.assign(**cambios)
+
+    return tablas['stock'], tablas['oc'], tablas['consumo']
@@ -4,6 +4,140 @@
 import pandas as pd
 import numpy as np
 import config # Importa config.py desde la misma carpeta 'src'
+import aggregations # Agregaciones por grupo (simulación por lotes)
+import row_index # Índices de filas por (SKU, bodega)
+from demand_cube import is_cube_current, sku_demand, warehouse_stats, warehouse_monthly
+from progress import as_reporter # Avance opcional (sin Streamlit)
+
+# Filas por bloque en la proyección por lotes (acota la memoria de la matriz intercalada)
+_BATCH_CHUNK_ROWS = 4096
+
+
+def _simulation_dates(start_date, simulation_days):
+    """Índice diario 'Fecha' del horizonte de simulación."""
+    return pd.DatetimeIndex(
+        pd.date_range(start=start_date, periods=simulation_days, freq='D'),
+        freq=None, name='Fecha'
+    )
+
+
+def _cumulative_levels(initial_stock, llegadas_diarias, daily_consumption):
+    """
+    Niveles de inventario al inicio de cada día para una o varias filas (SKUs).
+
+    - initial_stock: array (n,)
+    - llegadas_diarias: array (n, días)
+    - daily_consumption: array (n,)
+
+    Usa pasos intercalados [I_0, +llegada_0, -consumo, +llegada_1, -consumo, ...]
+    y una suma acumulada: mismas operaciones y mismo orden que el bucle día a
+    día, por lo que el resultado es idéntico (no solo aproximado).
+    """
+    n_filas, simulation_days = llegadas_diarias.shape
+    pasos = np.empty((n_filas, 2 * simulation_days + 1), dtype=np.float64)
+    pasos[:, 0] = initial_stock
+    pasos[:, 1::2] = llegadas_diarias
+    pasos[:, 2::2] = -np.asarray(daily_consumption, dtype=np.float64)[:, None]
+    
+    # El nivel al inicio del día 'd' es la suma acumulada hasta la posición 2*d
+    return np.cumsum(pasos, axis=1)[:, 0:2 * simulation_days:2]
+
+
+def project_inventory(initial_stock, llegadas_map, daily_consumption, start_date, simulation_days):
+    """
+    Proyecta el nivel de inventario diario con una suma acumulada.
+
+    Equivale al bucle día a día: se registra el nivel al inicio de cada día,
+    luego se suman las llegadas de ese día y se resta el consumo diario.
+
+    Retorna:
+    - pd.DataFrame con la columna 'NivelInventario' indexado por 'Fecha'.
+    """
+    # Índice de fechas (se construye una sola vez)
+    fechas = _simulation_dates(start_date, simulation_days)
+    
+    # Llegadas alineadas al índice (0 en los días sin llegadas)
+    llegadas_diarias = pd.Series(llegadas_map, dtype=np.float64).reindex(fechas, fill_value=0.0).to_numpy()
+    
+    niveles = _cumulative_levels(
+        np.array([initial_stock], dtype=np.float64),
+        llegadas_diarias[None, :],
+        np.array([daily_consumption], dtype=np.float64)
+    )[0]
+    
+    return pd.DataFrame({'NivelInventario': niveles}, index=fechas)
+
+
+def run_monte_carlo_simulation(
+    initial_stock,
+    llegadas_map,
+    daily_demand_mean,
+    daily_demand_std,
+    start_date,
+    simulation_days,
+    n_paths=10000,
+    seed=None,
+    percentiles=(5, 50, 95)
+):
+    """
+    Simulación Monte Carlo del inventario con demanda diaria aleatoria.
+
+    Sortea todas las trayectorias a la vez como una matriz (n_paths x días)
+    con demanda ~ Normal(daily_demand_mean, daily_demand_std) truncada en 0.
+    Las llegadas de OC son las mismas en todas las trayectorias.
+
+    Retorna:
+    - df_bandas: DataFrame indexado por 'Fecha' con una columna por percentil
+      ('P5', 'P50', 'P95', ...) del nivel de inventario y 'ProbQuiebre'
+      (fracción de trayectorias sin stock, nivel <= 0, ese día).
+    - mc_metrics: dict con 'n_paths', 'seed', 'expected_fill_rate' (promedio de
+      unidades servidas / demandadas) y 'prob_quiebre_horizonte' (fracción de
+      trayectorias con al menos un día sin stock).
+    """
+    rng = np.random.default_rng(seed)
+
+    fechas = _simulation_dates(start_date, simulation_days)
+    llegadas_diarias = pd.Series(llegadas_map, dtype=np.float64).reindex(fechas, fill_value=0.0).to_numpy()
+
+    # --- 1. Demanda sorteada (n_paths x días) ---
+    demanda = rng.normal(loc=daily_demand_mean, scale=max(0.0, daily_demand_std), size=(n_paths, simulation_days))
+    np.maximum(demanda, 0.0, out=demanda)
+
+    # --- 2. Niveles al inicio de cada día ---
+    neto = llegadas_diarias[None, :] - demanda
+    niveles = np.empty_like(neto)
+    niveles[:, 0] = initial_stock
+    np.cumsum(neto[:, :-1], axis=1, out=niveles[:, 1:])
+    niveles[:, 1:] += initial_stock
+    del neto
+
+    # --- 3. Nivel de servicio ---
+    # Disponible en el día = nivel inicial + llegadas (los negativos son pendientes)
+    disponible = niveles + llegadas_diarias[None, :]
+    np.clip(disponible, 0.0, None, out=disponible)
+    servido = np.minimum(demanda, disponible, out=disponible).sum(axis=1)
+    demandado = demanda.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fill_rate = np.where(demandado > 0, servido / demandado, 1.0)
+
+    sin_stock = niveles <= 0
+
+    # --- 4. Bandas ---
+    bandas = np.percentile(niveles, percentiles, axis=0)
+    df_bandas = pd.DataFrame(
+        {f"P{p:g}": banda for p, banda in zip(percentiles, bandas)},
+        index=fechas
+    )
+    df_bandas['ProbQuiebre'] = sin_stock.mean(axis=0)
+
+    mc_metrics = {
+        'n_paths': n_paths,
+        'seed': seed,
+        'expected_fill_rate': float(fill_rate.mean()),
+        'prob_quiebre_horizonte': float(sin_stock.any(axis=1).mean()),
+    }
+    return df_bandas, mc_metrics
+
 
 def run_inventory_simulation(
     sku_to_simulate: str,
@@ -14,11 +148,19 @@ def run_inventory_simulation(
     df_oc_raw: pd.DataFrame,
     simulation_days: int,
     lead_time_days: int, 
-    service_level_z: float
+    service_level_z: float,
+    row_indexes: dict = None,
+    demand_cube: dict = None
 ):
     """
     Ejecuta la lógica de simulación de inventario día a día.
-    (El contenido de esta función no cambia)
+    La trayectoria se calcula con 'project_inventory' (suma acumulada).
+    
+    'row_indexes' (opcional, ver 'row_index.build_table_indexes') permite
+    tomar directamente las filas del SKU en vez de recorrer las tablas.
+    'demand_cube' (opcional, ver 'demand_cube.build_demand_cube') entrega
+    la demanda mensual ya agregada; si no corresponde al mes actual se
+    recalcula desde 'df_consumo_raw'.
     """
     
     # Define la fecha de 'hoy' (inicio de la simulación)
@@ -27,10 +169,13 @@ def run_inventory_simulation(
     # --- B. CÁLCULO DE STOCK INICIAL (I_0) ---
     
     # Filtra el DataFrame de stock para el SKU y bodega específicos
-    df_stock_filtered = df_stock_raw[
-        (df_stock_raw['CodigoArticulo'] == sku_to_simulate) &
-        (df_stock_raw['CodigoBodega'] == warehouse_code)
-    ].copy()
+    if row_indexes is not None:
+        df_stock_filtered = row_index.take_rows(df_stock_raw, row_indexes['stock'], sku_to_simulate, warehouse_code).copy()
+    else:
+        df_stock_filtered = df_stock_raw[
+            (df_stock_raw['CodigoArticulo'] == sku_to_simulate) &
+            (df_stock_raw['CodigoBodega'] == warehouse_code)
+        ].copy()
     
     # Asegura que el stock sea numérico y calcula el total
     df_stock_filtered['DisponibleParaPrometer'] = pd.to_numeric(df_stock_filtered['DisponibleParaPrometer'], errors='coerce')
@@ -38,11 +183,19 @@ def run_inventory_simulation(
 
     # --- C. CÁLCULO DE CONSUMO ---
     
+    usar_cubo = is_cube_current(demand_cube, today)
+    
     # Filtra el DataFrame de consumo para el SKU y bodega de consumo específicos
-    df_consumo_filtered = df_consumo_raw[
-        (df_consumo_raw['CodigoArticulo'] == sku_to_simulate) &
-        (df_consumo_raw['BodegaDestino_Requerida'] == consumption_warehouse)
-    ].copy()
+    # (no hace falta si la demanda sale del cubo)
+    if usar_cubo:
+        df_consumo_filtered = df_consumo_raw.iloc[0:0]
+    elif row_indexes is not None:
+        df_consumo_filtered = row_index.take_rows(df_consumo_raw, row_indexes['consumo'], sku_to_simulate, consumption_warehouse).copy()
+    else:
+        df_consumo_filtered = df_consumo_raw[
+            (df_consumo_raw['CodigoArticulo'] == sku_to_simulate) &
+            (df_consumo_raw['BodegaDestino_Requerida'] == consumption_warehouse)
+        ].copy()
     
     # Inicializa métricas de demanda (buena práctica para asegurar que existan)
     daily_demand_mean = 0.0
@@ -56,8 +209,21 @@ def run_inventory_simulation(
     start_of_M_minus_2 = start_of_current_month - pd.DateOffset(months=2)
     start_of_M_minus_3 = start_of_current_month - pd.DateOffset(months=3)
     
+    # Demanda desde el cubo: mismas estadísticas, sin 'resample'
+    if usar_cubo:
+        stats, consumo_mensual = sku_demand(demand_cube, consumption_warehouse, sku_to_simulate)
+        if stats is not None:
+            monthly_demand_mean = stats['monthly_mean']
+            daily_demand_mean = monthly_demand_mean / config.AVERAGE_DAYS_PER_MONTH
+            daily_demand_std = stats['monthly_std'] / np.sqrt(config.AVERAGE_DAYS_PER_MONTH)
+            
+            demand_M_0 = consumo_mensual.get(start_of_current_month, 0)
+            demand_M_1 = consumo_mensual.get(start_of_M_minus_1, 0)
+            demand_M_2 = consumo_mensual.get(start_of_M_minus_2, 0)
+            demand_M_3 = consumo_mensual.get(start_of_M_minus_3, 0)
+    
     # Solo procesa si hay historial de consumo
-    if not df_consumo_filtered.empty:
+    elif not df_consumo_filtered.empty:
         
         # 1. Preparación de datos de consumo
         
@@ -108,52 +274,35 @@ def run_inventory_simulation(
 
     # --- E. CÁLCULO DE LLEGADAS (OC) ---
     
-    df_oc_clean = df_oc_raw.copy()
-    try:
-        df_oc_clean['Fecha de entrega de la línea'] = pd.to_datetime(df_oc_clean['Fecha de entrega de la línea'], format='%Y-m-%d', errors='coerce')
-        df_oc_clean['Cantidad'] = pd.to_numeric(df_oc_clean['Cantidad'], errors='coerce')
-    except Exception as e:
-        print(f"Error limpiando df_oc: {e}.") 
-
+    # 'df_oc_raw' ya viene normalizada desde 'data_loader' (fechas y cantidades)
+    
     # Filtra OC relevantes
-    df_llegadas_detalle = df_oc_clean[
-        (df_oc_clean['Número de artículo'] == sku_to_simulate) &
-        (df_oc_clean['Cantidad'] > 0) & 
-        (df_oc_clean['Fecha de entrega de la línea'] >= today)
+    if row_indexes is not None:
+        df_oc_sku = row_index.take_rows(df_oc_raw, row_indexes['oc'], sku_to_simulate)
+    else:
+        df_oc_sku = df_oc_raw[df_oc_raw['Número de artículo'] == sku_to_simulate]
+    
+    df_llegadas_detalle = df_oc_sku[
+        (df_oc_sku['Cantidad'] > 0) & 
+        (df_oc_sku['Fecha de entrega de la línea'] >= today)
     ]
     
     llegadas_por_fecha = df_llegadas_detalle.groupby('Fecha de entrega de la línea')['Cantidad'].sum() 
     llegadas_map = llegadas_por_fecha.to_dict()
     
-    # --- F. EJECUTAR SIMULACIÓN DÍA A DÍA ---
+    # --- F. PROYECTAR INVENTARIO (VECTORIZADO) ---
     
-    inventory_level = initial_stock
-    history_list = [] 
-    date_list = []    
-
-    for day in range(simulation_days):
-        current_date = today + pd.Timedelta(days=day)
-        
-        history_list.append(inventory_level)
-        date_list.append(current_date)
-        
-        inventory_level += llegadas_map.get(current_date, 0)
-        
-        if daily_demand_std > 0:
-            daily_consumption = np.random.normal(loc=daily_demand_mean, scale=0) #, scale=daily_demand_std)
-        else:
-            daily_consumption = daily_demand_mean
-            
-        daily_consumption = max(0, daily_consumption)
-        inventory_level -= daily_consumption
-        
-    df_sim = pd.DataFrame({'NivelInventario': history_list}, index=pd.Index(date_list, name='Fecha'))
+    # La rama estocástica usaba scale=0, es decir, consumo diario = media.
+    daily_consumption = max(0, daily_demand_mean)
+    df_sim = project_inventory(initial_stock, llegadas_map, daily_consumption, today, simulation_days)
 
     # --- G. EMPAQUETAR RESULTADOS ---
     
     metrics = {
         'initial_stock': initial_stock,
         'monthly_demand_mean': monthly_demand_mean,
+        'daily_demand_mean': daily_demand_mean,
+        'daily_demand_std': daily_demand_std,
         'llegadas_count': len(llegadas_map),
         'safety_stock': safety_stock,
         'reorder_point': reorder_point,
@@ -163,4 +312,131 @@ def run_inventory_simulation(
         'demand_M_3': (start_of_M_minus_3, demand_M_3),
     }
 
-    return df_sim, metrics, llegadas_map, df_llegadas_detalle
\ No newline at end of file
+    return df_sim, metrics, llegadas_map, df_llegadas_detalle
+
+
+def run_portfolio_simulation(
+    skus,
+    warehouse_code: str,
+    consumption_warehouse: str,
+    df_stock_raw: pd.DataFrame,
+    df_consumo_raw: pd.DataFrame,
+    df_oc_raw: pd.DataFrame,
+    simulation_days: int,
+    lead_time_days: int,
+    service_level_z: float,
+    demand_cube: dict = None,
+    progress=None
+):
+    """
+    Simulación por lotes: proyecta muchos SKUs a la vez con una sola pasada
+    de preprocesamiento sobre stock, consumo y OC (normalizada por 'data_loader').
+
+    - skus: lista de SKUs, o "all" para todos los SKUs con stock en
+      'warehouse_code' o consumo en 'consumption_warehouse'.
+    - demand_cube: (opcional) cubo de demanda precalculado, ver
+      'demand_cube.build_demand_cube'.
+    - progress: (opcional) recibe el avance por bloque de SKUs, ver
+      'progress.as_reporter'.
+
+    Cada fila es idéntica a la trayectoria de 'run_inventory_simulation'
+    para ese SKU.
+
+    Retorna:
+    - df_matriz: DataFrame (SKU x Fecha) con el nivel de inventario diario.
+    - df_metricas: DataFrame indexado por SKU con las mismas métricas de
+      'run_inventory_simulation' (demand_M_k solo con el valor) más
+      'stock_final', 'stock_minimo' y 'fecha_quiebre' (primer día sin stock).
+    """
+    progress = as_reporter(progress)
+    today = pd.Timestamp.now().floor('D')
+    
+    # --- A. Filtros por bodega (una sola vez) ---
+    progress.update(0.0, "Preparando stock, consumo y OC...")
+    df_stock = df_stock_raw[df_stock_raw['CodigoBodega'] == warehouse_code]
+    df_consumo = df_consumo_raw[df_consumo_raw['BodegaDestino_Requerida'] == consumption_warehouse]
+    
+    if isinstance(skus, str) and skus == "all":
+        skus = sorted(
+            set(df_stock['CodigoArticulo'].dropna().unique()) |
+            set(df_consumo['CodigoArticulo'].dropna().unique())
+        )
+    sku_index = pd.Index(list(skus), name='SKU')
+    fechas = _simulation_dates(today, simulation_days)
+    
+    # --- B. Stock inicial ---
+    initial_stock = aggregations.initial_stock_by(df_stock, ['CodigoArticulo']).reindex(sku_index, fill_value=0.0)
+    initial_stock = initial_stock.to_numpy(dtype=np.float64)
+    
+    # --- C. Consumo (media, std y meses M..M-3) ---
+    if is_cube_current(demand_cube, today):
+        mensual = warehouse_monthly(demand_cube, consumption_warehouse)
+        stats = warehouse_stats(demand_cube, consumption_warehouse)
+    else:
+        mensual = aggregations.monthly_demand_by(df_consumo, ['CodigoArticulo'])
+        stats = aggregations.demand_stats_by(df_consumo, ['CodigoArticulo'], today, mensual=mensual)
+    monthly_demand_mean = stats['monthly_mean'].reindex(sku_index, fill_value=0.0).to_numpy(dtype=np.float64)
+    monthly_demand_std = stats['monthly_std'].reindex(sku_index, fill_value=0.0).to_numpy(dtype=np.float64)
+    
+    daily_demand_mean = monthly_demand_mean / config.AVERAGE_DAYS_PER_MONTH
+    daily_demand_std = monthly_demand_std / np.sqrt(config.AVERAGE_DAYS_PER_MONTH)
+    
+    start_of_current_month = today.replace(day=1)
+    meses_recientes = [start_of_current_month - pd.DateOffset(months=k) for k in range(4)]
+    demanda_meses = mensual.unstack('Mes').reindex(index=sku_index, columns=pd.DatetimeIndex(meses_recientes), fill_value=0.0)
+    demanda_meses = demanda_meses.fillna(0.0)
+    
+    # --- D. SS y ROP ---
+    demand_during_lead_time = daily_demand_mean * lead_time_days
+    std_dev_during_lead_time = daily_demand_std * np.sqrt(lead_time_days)
+    safety_stock = service_level_z * std_dev_during_lead_time
+    reorder_point = demand_during_lead_time + safety_stock
+    
+    # --- E. Llegadas (OC) como matriz SKU x Fecha ---
+    df_oc = df_oc_raw[df_oc_raw['Número de artículo'].isin(sku_index)]
+    
+    por_fecha = aggregations.future_arrivals_by_date(df_oc, today)
+    llegadas_count = por_fecha.groupby(level=0, observed=True).size().reindex(sku_index, fill_value=0)
+    llegadas_matriz = por_fecha.unstack(level=1).reindex(index=sku_index, columns=fechas).fillna(0.0)
+    llegadas_matriz = llegadas_matriz.to_numpy(dtype=np.float64)
+    
+    # --- F. Proyección por bloques de SKUs ---
+    daily_consumption = np.maximum(0, daily_demand_mean)
+    niveles = np.empty((len(sku_index), simulation_days), dtype=np.float64)
+    for inicio in range(0, len(sku_index), _BATCH_CHUNK_ROWS):
+        bloque = slice(inicio, inicio + _BATCH_CHUNK_ROWS)
+        niveles[bloque] = _cumulative_levels(initial_stock[bloque], llegadas_matriz[bloque], daily_consumption[bloque])
+        hechos = min(inicio + _BATCH_CHUNK_ROWS, len(sku_index))
+        progress.update(0.3 + 0.6 * hechos / len(sku_index), f"Proyectando SKUs ({hechos}/{len(sku_index)})...")
+    
+    df_matriz = pd.DataFrame(niveles, index=sku_index, columns=fechas)
+    
+    # --- G. Tabla de métricas ---
+    if simulation_days > 0:
+        sin_stock = niveles <= 0
+        primer_quiebre = np.where(sin_stock.any(axis=1), sin_stock.argmax(axis=1), -1)
+        fecha_quiebre = pd.Series(fechas.take(np.maximum(primer_quiebre, 0)), index=sku_index)
+        fecha_quiebre = fecha_quiebre.where(primer_quiebre >= 0)
+    else:
+        # Sin días simulados no hay quiebre
+        fecha_quiebre = pd.Series(pd.NaT, index=sku_index, dtype=fechas.dtype)
+    
+    df_metricas = pd.DataFrame({
+        'initial_stock': initial_stock,
+        'monthly_demand_mean': monthly_demand_mean,
+        'daily_demand_mean': daily_demand_mean,
+        'daily_demand_std': daily_demand_std,
+        'llegadas_count': llegadas_count.to_numpy(),
+        'safety_stock': safety_stock,
+        'reorder_point': reorder_point,
+        'demand_M_0': demanda_meses.iloc[:, 0].to_numpy(),
+        'demand_M_1': demanda_meses.iloc[:, 1].to_numpy(),
+        'demand_M_2': demanda_meses.iloc[:, 2].to_numpy(),
+        'demand_M_3': demanda_meses.iloc[:, 3].to_numpy(),
+        'stock_final': niveles[:, -1] if simulation_days > 0 else initial_stock,
+        'stock_minimo': niveles.min(axis=1) if simulation_days > 0 else initial_stock,
+        'fecha_quiebre': fecha_quiebre,
+    }, index=sku_index)
+    
+    progress.finish(f"{len(sku_index)} SKUs simulados.")
+    return df_matriz, df_metricas
@@ -0,0 +1,79 @@
+# --- ARCHIVO: src/sku_canonical.py ---
+# (NUEVO ARCHIVO: homogenización de SKUs con 'config.MAPEO_SKUS' resuelto a su cierre transitivo)
+
+import numpy as np
+import pandas as pd
+import config
+
+# Columna de SKU de cada tabla
+SKU_COLUMNS = {'stock': 'CodigoArticulo', 'consumo': 'CodigoArticulo', 'oc': 'Número de artículo'}
+
+
+def resolve_mapping(mapeo):
+    """
+    Resuelve las cadenas del mapeo (A -> B -> C) para que cada SKU apunte
+    directo a su SKU final (A -> C, B -> C).
+
+    Lanza:
+    - ValueError: Si el mapeo tiene un ciclo (A -> B -> A).
+    """
+    cierre = {}
+    for origen in mapeo:
+        camino = [origen]
+        destino = mapeo[origen]
+        while destino in mapeo and destino not in cierre:
+            if destino in camino:
+                raise ValueError(f"MAPEO_SKUS tiene un ciclo: {' -> '.join(camino + [destino])}")
+            camino.append(destino)
+            destino = mapeo[destino]
+        destino = cierre.get(destino, destino)
+        for sku in camino:
+            cierre[sku] = destino
+    return cierre
+
+
+def canonicalize_tables(df_stock, df_oc, df_consumo, tablas=None, mapeo=None):
+    """
+    Reemplaza los SKUs de las tablas indicadas por su SKU canónico.
+
+    - tablas: {'stock': bool, 'consumo': bool, 'oc': bool} (por defecto
+      'config.SKU_CANONICAL_TABLES')
+    - mapeo: por defecto 'config.MAPEO_SKUS'
+
+    Las tres columnas de SKU quedan con el mismo CategoricalDtype (las
+    categorías actuales más los SKUs destino). El reemplazo se calcula una
+    vez sobre las categorías y se aplica a cada tabla remapeando los
+    códigos (una sola pasada, sin comparar textos fila a fila).
+
+    Retorna:
+    - tupla: (df_stock, df_oc, df_consumo)
+    """
+    if tablas is None:
+        tablas = config.SKU_CANONICAL_TABLES
+    cierre = resolve_mapping(config.MAPEO_SKUS if mapeo is None else mapeo)
+    dfs = {'stock': df_stock, 'oc': df_oc, 'consumo': df_consumo}
+
+    # --- 1. Dominio común de SKUs (incluye los destinos del mapeo) ---
+    categorias = set(cierre.values())
+    for nombre, df in dfs.items():
+        serie = df[SKU_COLUMNS[nombre]]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias.update(serie.cat.categories)
+        else:
+            categorias.update(serie.dropna().unique())
+    dtype = pd.CategoricalDtype(sorted(categorias))
+
+    # --- 2. Código de origen -> código canónico (sobre las categorías) ---
+    destino = dtype.categories.get_indexer([cierre.get(sku, sku) for sku in dtype.categories])
+
+    # --- 3. Remapeo de códigos por tabla ---
+    for nombre, df in dfs.items():
+        columna = SKU_COLUMNS[nombre]
+        serie = df[columna].astype(dtype)
+        if tablas.get(nombre, False) and cierre:
+            codigos = serie.cat.codes.to_numpy()
+            codigos = np.where(codigos >= 0, destino[codigos], -1)
+            serie = pd.Series(pd.Categorical.from_codes(codigos, dtype=dtype), index=df.index, name=columna)
+        dfs[nombre] = df.assign(**{columna: serie})
+
+    return dfs['stock'], dfs['oc'], dfs['consumo']
@@ -0,0 +1,113 @@
+# --- ARCHIVO: src/sku_catalog.py ---
+# (NUEVO ARCHIVO: catálogo de SKUs para los selectores, con búsqueda por código y nombre)
+
+import bisect
+import difflib
+import re
+import numpy as np
+import pandas as pd
+
+# SKU seleccionado por defecto en los selectores
+DEFAULT_SKU = 'EXI-009231'
+
+_PALABRA = re.compile(r'\w+')
+_SIN_POSICIONES = np.array([], dtype=np.intp)
+
+
+class SkuCatalog:
+    """
+    SKUs (ordenados) con su nombre, las opciones "SKU | Nombre" de los
+    selectores y un índice de búsqueda (prefijo de código, subcadena de
+    código, prefijo de palabras del nombre y, si nada coincide, similitud).
+
+    Se construye una vez por versión de datos (ver 'engine_cache.get_sku_catalog').
+
+    Uso:
+        catalogo = SkuCatalog(skus, df_stock)
+        catalogo.opciones[catalogo.default_index]
+        catalogo.search('panel 650')
+    """
+
+    def __init__(self, skus, df_stock, default_sku=DEFAULT_SKU):
+        self.skus = [str(sku) for sku in skus]
+
+        # --- 1. Nombres (primer nombre de cada SKU en el stock) ---
+        nombres = df_stock.drop_duplicates(subset=['CodigoArticulo'])[['CodigoArticulo', 'NombreArticulo']]
+        self.mapa_nombres = dict(zip(
+            nombres['CodigoArticulo'].astype(object).astype(str),
+            nombres['NombreArticulo'].astype(object)
+        ))
+        self.opciones = [f"{sku} | {self.mapa_nombres.get(sku, 'Nombre no encontrado')}" for sku in self.skus]
+
+        # --- 2. SKU por defecto (primera opción que empieza con él) ---
+        self.default_index = next(
+            (i for i, opcion in enumerate(self.opciones) if opcion.startswith(default_sku)), 0
+        )
+
+        # --- 3. Índice de búsqueda ---
+        codigos = pd.Series(self.skus, dtype=object).str.lower()
+        self._codigos = codigos
+        self._orden_codigos = np.argsort(codigos.to_numpy(), kind='stable')
+        self._codigos_ordenados = codigos.to_numpy()[self._orden_codigos].tolist()
+
+        por_palabra = {}
+        for i, sku in enumerate(self.skus):
+            for palabra in _PALABRA.findall(str(self.mapa_nombres.get(sku, '')).lower()):
+                por_palabra.setdefault(palabra, set()).add(i)
+        self._palabras = sorted(por_palabra)
+        self._por_palabra = {palabra: np.array(sorted(pos), dtype=np.intp) for palabra, pos in por_palabra.items()}
+
+    def __len__(self):
+        return len(self.skus)
+
+    def _por_prefijo(self, ordenados, prefijo):
+        """Posiciones (en 'ordenados') de los textos que empiezan con 'prefijo'."""
+        desde = bisect.bisect_left(ordenados, prefijo)
+        hasta = bisect.bisect_left(ordenados, prefijo + '\uffff')
+        return desde, hasta
+
+    def _coincidencias(self, termino):
+        """SKUs (posiciones) cuyo código contiene 'termino' o con una palabra del nombre que empieza con él."""
+        desde, hasta = self._por_prefijo(self._palabras, termino)
+        listas = [self._por_palabra[p] for p in self._palabras[desde:hasta]]
+        listas.append(np.flatnonzero(self._codigos.str.contains(termino, regex=False).to_numpy()))
+        return np.unique(np.concatenate(listas))
+
+    def _similares(self, termino):
+        """SKUs cuyo código o palabra del nombre se parece a 'termino' (errores de tipeo)."""
+        encontrados = [_SIN_POSICIONES]
+        for palabra in difflib.get_close_matches(termino, self._palabras, n=10, cutoff=0.75):
+            encontrados.append(self._por_palabra[palabra])
+        if not any(c.isdigit() for c in termino):
+            return np.unique(np.concatenate(encontrados)) # Solo los códigos llevan dígitos
+        for codigo in difflib.get_close_matches(termino, self._codigos_ordenados, n=10, cutoff=0.75):
+            desde, hasta = self._por_prefijo(self._codigos_ordenados, codigo)
+            encontrados.append(self._orden_codigos[desde:hasta])
+        return np.unique(np.concatenate(encontrados))
+
+    def search(self, texto, limite=200):
+        """
+        Opciones "SKU | Nombre" que coinciden con todas las palabras de
+        'texto' (sin distinguir mayúsculas). Primero las que empiezan con
+        el código buscado. Si ninguna coincide, busca por similitud.
+
+        Retorna:
+        - list: hasta 'limite' opciones (las primeras si 'texto' está vacío)
+        """
+        terminos = texto.lower().split()
+        if not terminos:
+            return self.opciones[:limite]
+
+        posiciones = None
+        for termino in terminos:
+            encontrados = self._coincidencias(termino)
+            if not len(encontrados):
+                encontrados = self._similares(termino)
+            posiciones = encontrados if posiciones is None else np.intersect1d(posiciones, encontrados, assume_unique=True)
+
+        # Primero los SKUs cuyo código empieza con el primer término
+        desde, hasta = self._por_prefijo(self._codigos_ordenados, terminos[0])
+        prefijo = np.isin(posiciones, self._orden_codigos[desde:hasta])
+        posiciones = np.concatenate([posiciones[prefijo], posiciones[~prefijo]])
+        return [self.opciones[i] for i in posiciones[:limite]]
+
@@ -8,7 +8,11 @@ import matplotlib.dates as mdates
 import locale
 import config   # Importa config.py desde la misma carpeta 'src'
 import analysis # Importa analysis.py desde la misma carpeta 'src'
+import progress # Reporte de avance de los motores
+import sku_catalog # Catálogo de SKUs de los selectores
+import chart_data # Datos reducidos para los gráficos
 import altair as alt
+from contextlib import contextmanager
 
 
 def setup_locale():
@@ -21,27 +25,41 @@ def setup_locale():
         except locale.Error:
             print(f"Locale '{config.LOCALE_ES}' o '{config.LOCALE_ES_FALLBACK}' no encontrado.")
 
+@contextmanager
+def streamlit_progress(texto_inicial, min_interval_ms=progress.MIN_INTERVAL_MS, min_step=progress.MIN_STEP):
+    """
+    Barra 'st.progress' conectada a un ProgressReporter (con límite de
+    actualizaciones) para pasar como 'progress' a los motores.
+    La barra se borra al salir del bloque.
+    """
+    barra = st.progress(0, text=texto_inicial)
+
+    def actualizar(fraccion, texto):
+        barra.progress(fraccion, text=texto or texto_inicial)
+
+    try:
+        yield progress.ProgressReporter(actualizar, min_interval_ms=min_interval_ms, min_step=min_step)
+    finally:
+        barra.empty()
+
+def display_data_version():
+    """Muestra la versión (y hora de carga) de los datos con que se calculan los resultados."""
+    if 'data_version' in st.session_state:
+        st.caption(
+            f"📂 Datos: versión {st.session_state.data_version} · "
+            f"cargados el {st.session_state.data_loaded_at:%d/%m/%Y %H:%M}"
+        )
+
 def create_sku_options(all_skus, df_stock):
     """
     Crea la lista de opciones para el selector de SKU (Req. 2).
     Formato: "SKU | Nombre"
+
+    Construye un 'SkuCatalog' en cada llamada; las páginas usan el catálogo
+    cacheado por versión de datos ('engine_cache.get_sku_catalog').
     """
-    mapa_nombres = df_stock.drop_duplicates(subset=['CodigoArticulo']).set_index('CodigoArticulo')['NombreArticulo'].to_dict()
-    
-    opciones_selector_sku = []
-    for sku in all_skus:
-        nombre = mapa_nombres.get(sku, "Nombre no encontrado")
-        opciones_selector_sku.append(f"{sku} | {nombre}")
-        
-    # Buscar el índice del SKU por defecto
-    default_sku = 'EXI-009231'
-    default_index = 0
-    for i, option in enumerate(opciones_selector_sku):
-        if option.startswith(default_sku):
-            default_index = i
-            break
-            
-    return opciones_selector_sku, mapa_nombres, default_index
+    catalogo = sku_catalog.SkuCatalog(all_skus, df_stock)
+    return catalogo.opciones, catalogo.mapa_nombres, catalogo.default_index
 
 def display_metrics(metrics, lead_time_days, service_level_z):
     """Muestra todas las métricas en la app de Streamlit."""
@@ -105,24 +123,13 @@ def display_metrics(metrics, lead_time_days, service_level_z):
 def generate_simulation_plot(df_sim, metrics, llegadas_map, sku_name, simulation_days):
     """
     Genera un gráfico interactivo de Altair.
-    (El contenido de esta función no cambia)
+    Solo se envían los cambios de pendiente del inventario (ver 'chart_data.py');
+    ROP y SS se dibujan como reglas horizontales.
     """
     
     # --- 1. PREPARACIÓN DE DATOS ---
-    df_plot = df_sim.reset_index()
-    df_plot['ROP'] = metrics['reorder_point']
-    df_plot['SafetyStock'] = metrics['safety_stock']
-    
-    df_lines = df_plot.melt(
-        id_vars=['Fecha'],
-        value_vars=['NivelInventario', 'ROP', 'SafetyStock'],
-        var_name='Leyenda', 
-        value_name='Valor'
-    )
-    
-    df_llegadas = pd.DataFrame(list(llegadas_map.items()), columns=['Fecha', 'CantidadLlegada'])
-    df_llegadas = pd.merge(df_llegadas, df_plot, on='Fecha', how='left')
-    df_llegadas['Leyenda'] = 'Llegada de OC' 
+    datos = chart_data.build_inventory_chart_data(df_sim, metrics, llegadas_map)
+    df_llegadas = datos['llegadas']
 
     df_zero_line = pd.DataFrame({'y': [0]})
 
@@ -130,12 +137,8 @@ def generate_simulation_plot(df_sim, metrics, llegadas_map, sku_name, simulation
     domain = ['NivelInventario', 'ROP', 'SafetyStock', 'Llegada de OC']
     range_colors = ['#1f77b4', '#ff7f0e', '#9467bd', '#2ca02c'] 
 
-    # Capa 1: Línea de Inventario
-    inventory_line = alt.Chart(
-        df_lines.loc[df_lines['Leyenda'] == 'NivelInventario']
-    ).mark_line(
-        interpolate='step-after', point=True
-    ).encode(
+    # Capa 1: Línea de Inventario (lineal; sin marcadores: solo hay puntos donde cambia la pendiente)
+    inventory_line = alt.Chart(datos['inventario']).mark_line().encode(
         x=alt.X('Fecha:T', title='Fecha', axis=alt.Axis(format="%Y-%m-%d")),
         y=alt.Y('Valor:Q', title='Unidades en Stock'),
         color=alt.Color('Leyenda:N', scale=alt.Scale(domain=domain, range=range_colors), title='Leyenda'),
@@ -146,13 +149,10 @@ def generate_simulation_plot(df_sim, metrics, llegadas_map, sku_name, simulation
         ]
     )
     
-    # Capa 2: Líneas de Referencia (ROP y SS)
-    reference_lines = alt.Chart(
-        df_lines.loc[df_lines['Leyenda'] != 'NivelInventario']
-    ).mark_line(
+    # Capa 2: Líneas de Referencia (ROP y SS), como reglas horizontales
+    reference_lines = alt.Chart(datos['referencias']).mark_rule(
         strokeDash=[5, 5]
     ).encode(
-        x=alt.X('Fecha:T'), 
         y=alt.Y('Valor:Q'),
         color=alt.Color('Leyenda:N', scale=alt.Scale(domain=domain, range=range_colors)),
         tooltip=[
@@ -189,6 +189,103 @@ def generate_simulation_plot(df_sim, metrics, llegadas_map, sku_name, simulation
     return final_chart
 
 
+def generate_monte_carlo_plot(df_bandas, metrics, sku_name, simulation_days):
+    """
+    Genera el gráfico de bandas de incertidumbre (Monte Carlo) con Altair.
+    Banda P5-P95, mediana P50 y líneas de referencia ROP / SS.
+    """
+    
+    # --- 1. PREPARACIÓN DE DATOS ---
+    # Solo los cambios de pendiente de las bandas, con presupuesto de puntos (ver 'chart_data.py')
+    df_plot = chart_data.build_band_chart_data(df_bandas)
+    df_plot = df_plot.assign(Leyenda='Banda P5-P95')
+    df_mediana = df_plot[['Fecha', 'P50']].assign(Leyenda='Mediana (P50)')
+    df_ref = pd.DataFrame({
+        'Leyenda': ['ROP', 'SafetyStock'],
+        'Valor': [metrics['reorder_point'], metrics['safety_stock']]
+    })
+
+    domain = ['Banda P5-P95', 'Mediana (P50)', 'ROP', 'SafetyStock']
+    range_colors = ['#aec7e8', '#1f77b4', '#ff7f0e', '#9467bd']
+    color_scale = alt.Scale(domain=domain, range=range_colors)
+
+    # --- 2. CAPAS ---
+    banda = alt.Chart(df_plot).mark_area(opacity=0.5).encode(
+        x=alt.X('Fecha:T', title='Fecha', axis=alt.Axis(format="%Y-%m-%d")),
+        y=alt.Y('P5:Q', title='Unidades en Stock'),
+        y2='P95:Q',
+        color=alt.Color('Leyenda:N', scale=color_scale, title='Leyenda'),
+        tooltip=[
+            alt.Tooltip('Fecha:T', format="%Y-%m-%d"),
+            alt.Tooltip('P5:Q', title='P5', format=',.0f'),
+            alt.Tooltip('P95:Q', title='P95', format=',.0f'),
+            alt.Tooltip('ProbQuiebre:Q', title='Prob. Quiebre', format='.1%')
+        ]
+    )
+
+    mediana = alt.Chart(df_mediana).mark_line().encode(
+        x=alt.X('Fecha:T'),
+        y=alt.Y('P50:Q'),
+        color=alt.Color('Leyenda:N', scale=color_scale),
+        tooltip=[
+            alt.Tooltip('Fecha:T', format="%Y-%m-%d"),
+            alt.Tooltip('P50:Q', title='Mediana', format=',.0f')
+        ]
+    )
+
+    referencias = alt.Chart(df_ref).mark_rule(strokeDash=[5, 5]).encode(
+        y='Valor:Q',
+        color=alt.Color('Leyenda:N', scale=color_scale),
+        tooltip=[
+            alt.Tooltip('Leyenda:N', title='Tipo'),
+            alt.Tooltip('Valor:Q', title='Nivel', format=',.0f')
+        ]
+    )
+
+    zero_line = alt.Chart(pd.DataFrame({'y': [0]})).mark_rule(
+        color='red', strokeDash=[2, 2]
+    ).encode(y='y')
+
+    return (banda + mediana + referencias + zero_line).properties(
+        title=f'Bandas de Incertidumbre para {sku_name} ({simulation_days} días)'
+    ).interactive()
+
+
+def display_monte_carlo_results(df_bandas, mc_metrics, metrics, sku_name, simulation_days):
+    """Muestra las métricas y gráficos de la simulación Monte Carlo."""
+    
+    st.subheader("Simulación Monte Carlo 🎲")
+    st.caption(f"{mc_metrics['n_paths']:,} trayectorias de demanda (semilla: {mc_metrics['seed']}).")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric(
+        "Fill Rate Esperado", f"{mc_metrics['expected_fill_rate']:.1%}",
+        help="Promedio de la fracción de la demanda diaria atendida con stock disponible ese mismo día."
+    )
+    col2.metric(
+        "Prob. de Quiebre (horizonte)", f"{mc_metrics['prob_quiebre_horizonte']:.1%}",
+        help="Fracción de trayectorias con al menos un día sin stock."
+    )
+    col3.metric("Prob. de Quiebre (último día)", f"{df_bandas['ProbQuiebre'].iloc[-1]:.1%}")
+
+    chart_bandas = generate_monte_carlo_plot(df_bandas, metrics, sku_name, simulation_days)
+    st.altair_chart(chart_bandas, use_container_width=True)
+
+    chart_quiebre = alt.Chart(chart_data.build_band_chart_data(df_bandas)).mark_area(
+        opacity=0.6, color='#d62728'
+    ).encode(
+        x=alt.X('Fecha:T', title='Fecha', axis=alt.Axis(format="%Y-%m-%d")),
+        y=alt.Y('ProbQuiebre:Q', title='Prob. de Quiebre', axis=alt.Axis(format='%'), scale=alt.Scale(domain=[0, 1])),
+        tooltip=[
+            alt.Tooltip('Fecha:T', format="%Y-%m-%d"),
+            alt.Tooltip('ProbQuiebre:Q', title='Prob. de Quiebre', format='.1%')
+        ]
+    ).properties(
+        title='Probabilidad Diaria de Quiebre de Stock', height=200
+    )
+    st.altair_chart(chart_quiebre, use_container_width=True)
+
+
 def prepare_end_of_month_table(df_sim):
     """
     Toma el DataFrame de simulación diaria y lo resume a fin de mes (Req. 3).